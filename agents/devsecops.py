@@ -108,4 +108,5 @@ BLOCK — N critical/high findings requiring remediation (list them)
 """,
     "tools": ["Read", "Bash", "Grep", "Glob"],
     "model": "sonnet",
+    "interactive": False,
 }
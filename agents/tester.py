@@ -91,4 +91,5 @@ FAIL — N tests failing (list them)
 """,
     "tools": ["Read", "Write", "Bash", "Glob", "Grep"],
     "model": "sonnet",
+    "interactive": False,
 }
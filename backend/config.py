@@ -20,6 +20,12 @@ class Settings:
     BROWSE_ROOT: str = os.environ.get("BROWSE_ROOT", "/")
     ALLOW_HOST: bool = os.environ.get("ORCHESTRA_ALLOW_HOST", "").lower() == "true"
     AGENT_DOCKER_IMAGE: str = os.environ.get("AGENT_DOCKER_IMAGE", "agent-orchestra:latest")
+    # Seconds between simulated output lines; 0 makes simulated phases instant
+    SIMULATION_DELAY: float = float(os.environ.get("ORCHESTRA_SIMULATION_DELAY", "0.5"))
+    # Upper bound on phases of one execution running at the same time
+    MAX_PARALLEL_PHASES: int = max(1, int(os.environ.get("ORCHESTRA_MAX_PARALLEL_PHASES", "4")))
+    # Executions kept in memory; past this the least recently used one is evicted
+    MAX_RETAINED_EXECUTIONS: int = max(1, int(os.environ.get("ORCHESTRA_MAX_EXECUTIONS", "10000")))
 
 
 settings = Settings()
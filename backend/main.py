@@ -28,11 +28,16 @@ from backend.routes import (
 @asynccontextmanager
 async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
     """Application lifespan — initialize state on startup."""
+    import asyncio
     import logging
 
+    from backend.services.cli import prewarm_cli
     from backend.services.sandbox import get_sandbox_status
+    from backend.services.screenshots import close_browser
 
     store.init_agents()
+    prewarm_task = asyncio.create_task(prewarm_cli())
+    activity_task = asyncio.create_task(store.run_activity_broadcaster())
 
     status = get_sandbox_status()
     logger = logging.getLogger("backend.main")
@@ -48,6 +53,10 @@ async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
 
     yield
 
+    prewarm_task.cancel()
+    activity_task.cancel()
+    await close_browser()
+
 
 app = FastAPI(title="Agent Orchestra API", lifespan=lifespan)
 
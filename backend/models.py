@@ -56,6 +56,9 @@ class PipelineStep(BaseModel):
     phase: PipelinePhase
     status: PhaseStatus = "pending"
     agent_role: AgentRole | None = None
+    # Phases that must complete first; when any step sets it, the pipeline
+    # runs as a dependency graph instead of group by group
+    depends_on: list[str] | None = None
     started_at: str | None = None
     completed_at: str | None = None
     output: list[str] = Field(default_factory=list)
@@ -171,6 +174,7 @@ class CreateExecutionRequest(BaseModel):
     project_source: ProjectSource | None = None
     github_url: str | None = None  # Clone from GitHub
     codebase_id: str | None = None  # Reuse existing codebase
+    depends_on: dict[str, list[str]] | None = None  # phase → phases it waits for
 
 
 class WebSocketMessage(BaseModel):
@@ -301,7 +301,7 @@ async def _handle_user_message(
     exec_id = execution["id"]
 
     # Link execution to conversation
-    conversation["activeExecutionId"] = exec_id
+    store.set_active_execution(conversation, exec_id)
 
     # Create execution-start message
     if workflow == "feature-eval":
@@ -349,10 +349,10 @@ async def _handle_user_message(
                 step["completedAt"] = None
             store.dynamic_agents.pop(eid, None)
             store.file_activities.pop(eid, None)
+            store.files_modified.pop(eid, None)
             store.execution_messages.pop(eid, None)
-            for conv in store.conversations.values():
-                if conv.get("activeExecutionId") == eid:
-                    store.console_messages.pop(conv["id"], None)
+            for conv_id in store.conversations_for_execution(eid):
+                store.console_messages.pop(conv_id, None)
             await run_execution(eid)
 
     asyncio.create_task(_run_with_fallback(exec_id))
@@ -462,7 +462,7 @@ async def console_ws(websocket: WebSocket, conversation_id: str) -> None:
         return
 
     # Enforce per-conversation connection limit
-    existing = store.console_connections.get(conversation_id, set())
+    existing = store.console_connections.get(conversation_id, ())
     if len(existing) >= _MAX_CONSOLE_CONNECTIONS:
         await websocket.close(code=4004)
         return
@@ -470,15 +470,14 @@ async def console_ws(websocket: WebSocket, conversation_id: str) -> None:
     await websocket.accept()
 
     # Register this connection
-    if conversation_id not in store.console_connections:
-        store.console_connections[conversation_id] = set()
-    store.console_connections[conversation_id].add(websocket)
-
-    # Replay buffered console messages so the client sees history it missed
-    for msg in store.console_messages.get(conversation_id, []):
-        await websocket.send_text(json.dumps(msg))
+    store.register_websocket(store.console_connections, conversation_id, websocket)
 
     try:
+        # Replay buffered console messages so the client sees history it missed
+        history = store.replay_frame(store.console_messages, conversation_id)
+        if history is not None:
+            await websocket.send_text(history)
+
         while True:
             data = await websocket.receive_text()
             try:
@@ -508,19 +507,16 @@ async def console_ws(websocket: WebSocket, conversation_id: str) -> None:
                     question_id = message.get("questionId", "")
                     answer = message.get("answer", "")
                     entry = store.pending_questions.get(question_id)
-                    if entry and entry["answer"] is None:
-                        entry["answer"] = answer
-                        entry["event"].set()
+                    if entry and entry.answer is None:
+                        entry.answer = answer
+                        entry.event.set()
                         from backend.routes.internal import cleanup_question
                         cleanup_question(question_id)
                         # Broadcast dismissal to execution and console WS
-                        exec_id = entry.get("execution_id")
+                        exec_id = entry.execution_id
                         if exec_id:
                             dismiss_msg = {"type": "clarification-dismissed", "questionId": question_id}
-                            await store.broadcast(exec_id, dismiss_msg)
-                            for conv in store.conversations.values():
-                                if conv.get("activeExecutionId") == exec_id:
-                                    await store.broadcast_console(conv["id"], dismiss_msg)
+                            await store.broadcast_linked(exec_id, dismiss_msg)
                     # Also record as a conversation message
                     conversation = store.conversations.get(conversation_id)
                     if conversation and answer:
@@ -533,8 +529,4 @@ async def console_ws(websocket: WebSocket, conversation_id: str) -> None:
     except WebSocketDisconnect:
         pass
     finally:
-        conns = store.console_connections.get(conversation_id)
-        if conns is not None:
-            conns.discard(websocket)
-            if not conns:
-                del store.console_connections[conversation_id]
+        store.unregister_websocket(store.console_connections, conversation_id, websocket)
@@ -14,7 +14,7 @@ from backend import models, store
 from backend.config import settings
 from backend.models import CreateExecutionRequest
 from backend.services.dynamic_orchestrator import run_dynamic_execution
-from backend.services.orchestrator import run_execution
+from backend.services.orchestrator import run_execution, validate_dependencies
 
 router = APIRouter(prefix="/api/executions", tags=["executions"])
 
@@ -81,6 +81,42 @@ WORKFLOW_PIPELINES: dict[str, list[list[tuple[str, str]]]] = {
 }
 
 
+def _build_pipeline(req: CreateExecutionRequest) -> list[dict]:
+    """Build the request's pipeline steps, attaching dependsOn when the request sets it.
+
+    Raises HTTPException 422 for dependencies on phases outside the workflow
+    or dependency cycles.
+    """
+    groups = WORKFLOW_PIPELINES.get(req.workflow, WORKFLOW_PIPELINES["full-pipeline"])
+    pipeline = []
+    for group_idx, group in enumerate(groups):
+        for phase, agent_role in group:
+            pipeline.append({
+                "phase": phase,
+                "group": group_idx,
+                "status": "pending",
+                "agentRole": agent_role,
+                "startedAt": None,
+                "completedAt": None,
+                "output": [],
+            })
+
+    if req.depends_on is not None:
+        graph = {step["phase"]: set(req.depends_on.get(step["phase"], ())) for step in pipeline}
+        unknown = req.depends_on.keys() - graph.keys()
+        if unknown:
+            raise HTTPException(
+                status_code=422, detail=f"dependsOn names phases outside the workflow: {sorted(unknown)}",
+            )
+        try:
+            validate_dependencies(graph)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        for step in pipeline:
+            step["dependsOn"] = sorted(graph[step["phase"]])
+    return pipeline
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Routes
 # ──────────────────────────────────────────────────────────────────────────────
@@ -124,19 +160,7 @@ async def create_execution(req: CreateExecutionRequest) -> dict:
     exec_id = store.next_execution_id()
     now = datetime.now(timezone.utc).isoformat()
 
-    groups = WORKFLOW_PIPELINES.get(req.workflow, WORKFLOW_PIPELINES["full-pipeline"])
-    pipeline = []
-    for group_idx, group in enumerate(groups):
-        for phase, agent_role in group:
-            pipeline.append({
-                "phase": phase,
-                "group": group_idx,
-                "status": "pending",
-                "agentRole": agent_role,
-                "startedAt": None,
-                "completedAt": None,
-                "output": [],
-            })
+    pipeline = _build_pipeline(req)
 
     resolved_path = ""
     project_source_dict = None
@@ -208,17 +232,17 @@ async def create_execution(req: CreateExecutionRequest) -> dict:
 async def get_execution_agents(execution_id: str) -> list[dict]:
     """List dynamic agents for an execution."""
     agents = store.dynamic_agents.get(execution_id, {})
-    # Strip internal fields like result_event
-    return [
-        {k: v for k, v in agent.items() if k != "result_event"}
-        for agent in agents.values()
-    ]
+    # Strip internal fields like result_event and the dedup indexes
+    return [store.agent_snapshot(agent) for agent in agents.values()]
 
 
 @router.get("/{execution_id}/files")
 async def get_execution_files(execution_id: str) -> list[dict]:
     """Get file activity for an execution."""
-    return store.file_activities.get(execution_id, [])
+    return [
+        {**activity, "timestamp": datetime.fromtimestamp(activity["tsNs"] / 1e9, timezone.utc).isoformat()}
+        for activity in store.file_activities.get(execution_id, [])
+    ]
 
 
 # ──────────────────────────────────────────────────────────────────────────────
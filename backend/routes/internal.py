@@ -24,12 +24,12 @@ def cleanup_question(question_id: str) -> None:
     """Remove an answered question from the store."""
     entry = store.pending_questions.pop(question_id, None)
     if entry:
-        exec_id = entry.get("execution_id", "")
-        qlist = store.pending_questions_by_execution.get(exec_id, [])
-        if question_id in qlist:
-            qlist.remove(question_id)
-            if not qlist:
-                store.pending_questions_by_execution.pop(exec_id, None)
+        exec_id = entry.execution_id
+        questions = store.pending_questions_by_execution.get(exec_id)
+        if questions is not None:
+            questions.pop(question_id, None)
+            if not questions:
+                del store.pending_questions_by_execution[exec_id]
 
 
 class QuestionPayload(BaseModel):
@@ -50,19 +50,18 @@ async def post_question(payload: QuestionPayload) -> dict[str, str]:
         from fastapi.responses import JSONResponse
         return JSONResponse(status_code=429, content={"error": "Too many pending questions"})
 
-    entry: dict[str, Any] = {
-        "id": payload.id,
-        "execution_id": payload.execution_id,
-        "question": payload.question,
-        "options": payload.options,
-        "answer": None,
-        "event": asyncio.Event(),
-    }
+    entry = store.PendingQuestion(
+        id=payload.id,
+        execution_id=payload.execution_id,
+        question=payload.question,
+        options=payload.options,
+    )
     store.pending_questions[payload.id] = entry
 
-    if payload.execution_id not in store.pending_questions_by_execution:
-        store.pending_questions_by_execution[payload.execution_id] = []
-    store.pending_questions_by_execution[payload.execution_id].append(payload.id)
+    questions = store.pending_questions_by_execution.get(payload.execution_id)
+    if questions is None:
+        questions = store.pending_questions_by_execution[payload.execution_id] = {}
+    questions[payload.id] = entry
 
     # Broadcast to execution WebSocket so the dashboard shows the question
     clarification_msg = {
@@ -72,12 +71,8 @@ async def post_question(payload: QuestionPayload) -> dict[str, str]:
         "options": payload.options,
         "required": True,
     }
-    await store.broadcast(payload.execution_id, clarification_msg)
-
     # Also broadcast to linked console WebSocket(s)
-    for conv in store.conversations.values():
-        if conv.get("activeExecutionId") == payload.execution_id:
-            await store.broadcast_console(conv["id"], clarification_msg)
+    await store.broadcast_linked(payload.execution_id, clarification_msg)
 
     return {"id": payload.id}
 
@@ -91,13 +86,13 @@ async def get_answer(question_id: str) -> Any:
     if entry is None:
         return JSONResponse(status_code=404, content={"error": "Question not found"})
 
-    if entry["answer"] is not None:
-        return {"answer": entry["answer"]}
+    if entry.answer is not None:
+        return {"answer": entry.answer}
 
     # Wait up to 30 seconds for the answer
     try:
-        await asyncio.wait_for(entry["event"].wait(), timeout=30)
-        return {"answer": entry["answer"]}
+        await asyncio.wait_for(entry.event.wait(), timeout=30)
+        return {"answer": entry.answer}
     except asyncio.TimeoutError:
         return JSONResponse(status_code=204, content=None)
 
@@ -110,8 +105,8 @@ async def post_answer(question_id: str, payload: AnswerPayload) -> dict[str, str
         from fastapi.responses import JSONResponse
         return JSONResponse(status_code=404, content={"error": "Question not found"})
 
-    entry["answer"] = payload.answer
-    entry["event"].set()
+    entry.answer = payload.answer
+    entry.event.set()
     cleanup_question(question_id)
 
     return {"status": "ok"}
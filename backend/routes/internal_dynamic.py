@@ -6,7 +6,9 @@ Called by the MCP bridge (mcp_bridge_dynamic.py) — NOT by the frontend directl
 from __future__ import annotations
 
 import asyncio
+import collections
 import hmac
+import itertools
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Header, HTTPException
@@ -38,6 +40,14 @@ class _WaitForAgentsRequest(BaseModel):
 router = APIRouter(prefix="/api/internal", tags=["internal-dynamic"])
 
 MAX_AGENTS_PER_EXECUTION = 100
+# Lines of output kept per agent (older lines are dropped)
+AGENT_OUTPUT_CAP = 5000
+
+
+def _output_tail(agent: dict, n: int = 500) -> str:
+    """Join the last *n* output lines of an agent."""
+    output = agent["output"]
+    return "\n".join(itertools.islice(output, max(len(output) - n, 0), None))
 
 
 def _verify_token(token: str | None) -> None:
@@ -89,9 +99,12 @@ async def spawn_agent(
         "name": req.name,
         "task": req.task,
         "status": "pending",
-        "output": [],
+        "output": collections.deque(maxlen=AGENT_OUTPUT_CAP),
         "filesModified": [],
         "filesRead": [],
+        # O(1) dedup indexes for the lists above (stripped by store.agent_snapshot)
+        "_filesModifiedSet": set(),
+        "_filesReadSet": set(),
         "color": role_colors.get(req.role) or (store.agents.get(req.role) or {}).get("color", "#6b7280"),
         "icon": role_icons.get(req.role) or (store.agents.get(req.role) or {}).get("icon", "Bot"),
         "spawnedAt": now,
@@ -110,13 +123,10 @@ async def spawn_agent(
     # Broadcast agent-spawn event
     spawn_msg = {
         "type": "agent-spawn",
-        "agent": {k: v for k, v in agent.items() if k != "result_event"},
+        "agent": store.agent_snapshot(agent),
     }
-    await store.broadcast(req.execution_id, spawn_msg)
     # Also broadcast to linked console
-    for conv in store.conversations.values():
-        if conv.get("activeExecutionId") == req.execution_id:
-            await store.broadcast_console(conv["id"], spawn_msg)
+    await store.broadcast_linked(req.execution_id, spawn_msg)
 
     # Launch agent subprocess in background
     asyncio.create_task(launch_agent_subprocess(req.execution_id, agent_id))
@@ -138,7 +148,7 @@ async def get_agent_status(
             return {
                 "agent_id": agent_id,
                 "status": agent["status"],
-                "output": "\n".join(agent["output"][-500:]),
+                "output": _output_tail(agent),
                 "filesModified": agent["filesModified"],
                 "filesRead": agent["filesRead"],
             }
@@ -168,7 +178,7 @@ async def get_agent_result(
         return {
             "agent_id": agent_id,
             "status": agent["status"],
-            "output": "\n".join(agent["output"][-500:]),
+            "output": _output_tail(agent),
             "filesModified": agent["filesModified"],
         }
 
@@ -181,7 +191,7 @@ async def get_agent_result(
     return {
         "agent_id": agent_id,
         "status": agent["status"],
-        "output": "\n".join(agent["output"][-500:]),
+        "output": _output_tail(agent),
         "filesModified": agent.get("filesModified", []),
     }
 
@@ -243,7 +253,7 @@ async def wait_for_agents(
         return {
             "agent_id": agent_id,
             "status": agent["status"],
-            "output": "\n".join(agent["output"][-500:]),
+            "output": _output_tail(agent),
             "filesModified": agent.get("filesModified", []),
         }
 
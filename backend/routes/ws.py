@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from backend import store
@@ -31,7 +32,7 @@ async def execution_ws(websocket: WebSocket, execution_id: str) -> None:
         return
 
     # Enforce per-execution connection limit
-    existing = store.websocket_connections.get(execution_id, set())
+    existing = store.websocket_connections.get(execution_id, ())
     if len(existing) >= _MAX_CONNECTIONS_PER_EXECUTION:
         await websocket.close(code=4004)
         return
@@ -39,40 +40,39 @@ async def execution_ws(websocket: WebSocket, execution_id: str) -> None:
     await websocket.accept()
 
     # Register this connection
-    if execution_id not in store.websocket_connections:
-        store.websocket_connections[execution_id] = set()
-    store.websocket_connections[execution_id].add(websocket)
-
-    # Replay buffered messages so the client sees history it missed
-    for msg in store.execution_messages.get(execution_id, []):
-        await websocket.send_text(json.dumps(msg))
-
-    # Send a snapshot of the current execution state so the client knows
-    # whether the execution already completed before the WS connected
-    execution = store.executions.get(execution_id)
-    if execution:
-        await websocket.send_text(json.dumps({
-            "type": "execution-snapshot",
-            "execution": {
-                "id": execution["id"],
-                "status": execution["status"],
-                "pipeline": execution["pipeline"],
-            },
-        }))
-
-    # Replay any unanswered pending questions for this execution
-    for qid in store.pending_questions_by_execution.get(execution_id, []):
-        q = store.pending_questions.get(qid)
-        if q and q["answer"] is None:
-            await websocket.send_text(json.dumps({
-                "type": "clarification",
-                "questionId": q["id"],
-                "question": q["question"],
-                "options": q["options"],
-                "required": True,
-            }))
+    store.register_websocket(store.websocket_connections, execution_id, websocket)
 
     try:
+        # Replay buffered messages so the client sees history it missed
+        history = store.replay_frame(store.execution_messages, execution_id)
+        if history is not None:
+            await websocket.send_text(history)
+
+        # Send a snapshot of the current execution state so the client knows
+        # whether the execution already completed before the WS connected
+        execution = store.executions.get(execution_id)
+        if execution:
+            await websocket.send_text(orjson.dumps({
+                "type": "execution-snapshot",
+                "execution": {
+                    "id": execution["id"],
+                    "status": execution["status"],
+                    "pipeline": execution["pipeline"],
+                },
+            }).decode())
+
+        # Replay any unanswered pending questions for this execution (copied,
+        # since an answer may remove a question while we await each send)
+        for q in list(store.pending_questions_by_execution.get(execution_id, {}).values()):
+            if q.answer is None:
+                await websocket.send_text(orjson.dumps({
+                    "type": "clarification",
+                    "questionId": q.id,
+                    "question": q.question,
+                    "options": q.options,
+                    "required": True,
+                }).decode())
+
         while True:
             # Keep the connection alive; read any incoming messages
             data = await websocket.receive_text()
@@ -83,25 +83,17 @@ async def execution_ws(websocket: WebSocket, execution_id: str) -> None:
                     qid = message.get("questionId", "")
                     answer = message.get("answer", "")
                     entry = store.pending_questions.get(qid)
-                    if entry and entry["answer"] is None and entry.get("execution_id") == execution_id:
-                        entry["answer"] = answer
-                        entry["event"].set()
+                    if entry and entry.answer is None and entry.execution_id == execution_id:
+                        entry.answer = answer
+                        entry.event.set()
                         cleanup_question(qid)
-                        # Broadcast dismissal so all clients clear the question
+                        # Broadcast dismissal so all clients (execution and console) clear the question
                         dismiss_msg = {"type": "clarification-dismissed", "questionId": qid}
-                        await store.broadcast(execution_id, dismiss_msg)
-                        # Also broadcast to console WS
-                        for conv in store.conversations.values():
-                            if conv.get("activeExecutionId") == execution_id:
-                                await store.broadcast_console(conv["id"], dismiss_msg)
+                        await store.broadcast_linked(execution_id, dismiss_msg)
             except json.JSONDecodeError:
                 pass
     except WebSocketDisconnect:
         pass
     finally:
         # Clean up on disconnect
-        conns = store.websocket_connections.get(execution_id)
-        if conns is not None:
-            conns.discard(websocket)
-            if not conns:
-                del store.websocket_connections[execution_id]
+        store.unregister_websocket(store.websocket_connections, execution_id, websocket)
@@ -0,0 +1,69 @@
+"""Claude CLI launch helpers — executable lookup and the shared process environment."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Persistent V8 compile cache shared by every Claude CLI launch
+NODE_COMPILE_CACHE_DIR = Path(tempfile.gettempdir()) / "orchestra-node-compile-cache"
+# Upper bound for the startup prewarm run
+_PREWARM_TIMEOUT = 60
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_executable(name: str) -> str:
+    """Resolve a bare command name to an absolute path once per process."""
+    return shutil.which(name) or name
+
+
+@functools.lru_cache(maxsize=None)
+def cli_env() -> dict[str, str]:
+    """Environment for every Claude CLI process, built once and shared (never mutated).
+
+    Unsets CLAUDECODE to avoid nested session detection and reuses the V8
+    compile cache, whose directory is created on the first call.
+    """
+    try:
+        NODE_COMPILE_CACHE_DIR.mkdir(exist_ok=True)
+    except OSError as exc:
+        logger.warning("Node compile cache unavailable: %s", exc)
+    return {
+        **os.environ,
+        "CLAUDECODE": "",
+        "NODE_COMPILE_CACHE": str(NODE_COMPILE_CACHE_DIR),
+        "CUDA_MODULE_LOADING": "LAZY",
+    }
+
+
+async def prewarm_cli() -> None:
+    """Run ``claude --version`` once at startup to populate the Node compile cache.
+
+    This only warms the compile cache that later launches reuse through
+    :func:`cli_env`; no CLI processes are kept running.
+    """
+    if shutil.which("claude") is None:
+        return
+    try:
+        process = await asyncio.create_subprocess_exec(
+            resolve_executable("claude"), "--version",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            env=cli_env(),
+        )
+    except OSError as exc:
+        logger.info("Claude CLI prewarm skipped: %s", exc)
+        return
+    try:
+        await asyncio.wait_for(process.wait(), timeout=_PREWARM_TIMEOUT)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+    logger.info("Claude CLI prewarmed (compile cache: %s)", NODE_COMPILE_CACHE_DIR)
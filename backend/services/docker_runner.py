@@ -157,6 +157,7 @@ def _rewrite_mcp_config(
 ) -> str:
     """Rewrite MCP config for use inside the Docker container.
 
+    - Rewrites the interpreter to the container's python (the host sets sys.executable)
     - Rewrites bridge script paths from host paths to /app/backend/... inside container
     - Rewrites API URL for Docker networking (host.docker.internal on macOS)
 
@@ -166,6 +167,10 @@ def _rewrite_mcp_config(
         config = json.load(f)
 
     for server_name, server in config.get("mcpServers", {}).items():
+        # The host interpreter path does not exist inside the container
+        if "command" in server:
+            server["command"] = "python"
+
         args = server.get("args", [])
         new_args = []
         for arg in args:
@@ -197,6 +202,7 @@ def wrap_command_in_docker(
     env: dict[str, str],
     cwd: str,
     mcp_config_path: str | None = None,
+    stdin_prompt: bool = False,
 ) -> tuple[list[str], dict[str, str], str]:
     """Wrap a claude CLI command in `docker run`.
 
@@ -205,6 +211,7 @@ def wrap_command_in_docker(
         env: Environment variables for the process
         cwd: Working directory on the host
         mcp_config_path: Path to MCP config file (will be rewritten for container)
+        stdin_prompt: Keep stdin attached (``-i``) because the prompt is piped in
 
     Returns:
         (docker_cmd, docker_env, docker_cwd) — drop-in replacement for create_subprocess_exec
@@ -227,6 +234,8 @@ def wrap_command_in_docker(
 
     # Build docker run command
     docker_cmd: list[str] = ["docker", "run", "--rm"]
+    if stdin_prompt:
+        docker_cmd.append("-i")
 
     # Network mode
     if not use_macos:
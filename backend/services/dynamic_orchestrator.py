@@ -6,15 +6,22 @@ which uses MCP tools (spawn_agent, ask_user) to dynamically coordinate sub-agent
 from __future__ import annotations
 
 import asyncio
-import json
+import collections
+import itertools
 import logging
 import os
+import secrets
+import shutil
+import sys
 import tempfile
-import uuid
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 from agents.business_dev import BUSINESS_DEV
@@ -23,13 +30,223 @@ from agents.devsecops import DEVSECOPS
 from agents.tester import TESTER
 from backend import store
 from backend.config import settings
-from backend.services.parser import parse_finding
+from backend.services.cli import cli_env, resolve_executable
+from backend.services.output_batching import flush_output, queue_output, queue_output_many
+from backend.services.parser import iter_findings
 
 # Agent subprocess timeout (15 minutes)
 AGENT_TIMEOUT = 900
 # Orchestrator timeout (30 minutes)
 ORCHESTRATOR_TIMEOUT = 1800
 
+# Shared head of every dynamic CLI argv; the prompt itself is sent on stdin
+_CLI_ARGS_PREFIX = ("claude", "-p", "--output-format", "stream-json", "--verbose")
+
+# Leading stderr bytes kept for diagnostics; only the head is ever logged
+_STDERR_KEEP_BYTES = 4096
+# Seconds between SIGTERM and SIGKILL when a CLI run times out
+_TERMINATE_GRACE = 5
+
+# (bridge, execution_id) → MCP config file shared by every launch in that execution
+_mcp_config_paths: dict[tuple[str, str], str] = {}
+
+# execution_id → working directory already checked with isdir
+_verified_work_dirs: dict[str, str] = {}
+
+# Orchestrator output kept in memory for findings and the final summary
+_OUTPUT_LINES_CAP = 10_000
+
+# Stream lines above this size are decoded off the event loop
+_LARGE_LINE_BYTES = 8192
+_PARSE_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="stream-parse")
+
+
+# Bridges that only import the stdlib can skip site.py and user-site lookups.
+# mcp_bridge.py needs the installed mcp/httpx packages, so it keeps site.
+_STDLIB_ONLY_BRIDGES = frozenset({"mcp_bridge_dynamic.py"})
+
+
+def _mcp_config_for(bridge_name: str, execution_id: str) -> str:
+    """Return the MCP config file for a bridge, writing it once per execution."""
+    key = (bridge_name, execution_id)
+    path = _mcp_config_paths.get(key)
+    if path:
+        return path
+    mcp_config = {
+        "mcpServers": {
+            "orchestra": {
+                "command": sys.executable,
+                "args": [
+                    *(("-S", "-I") if bridge_name in _STDLIB_ONLY_BRIDGES else ()),
+                    str(Path(__file__).parent.parent / bridge_name),
+                ],
+                "env": {
+                    "ORCHESTRA_API_URL": f"http://127.0.0.1:{settings.PORT}",
+                    "ORCHESTRA_EXECUTION_ID": execution_id,
+                    "ORCHESTRA_INTERNAL_TOKEN": store.internal_api_token,
+                },
+            }
+        }
+    }
+    # mkstemp already creates the file 0600; write it with a single syscall
+    fd, path = tempfile.mkstemp(suffix=".json", prefix="orchestra-mcp-")
+    try:
+        os.write(fd, orjson.dumps(mcp_config))
+    finally:
+        os.close(fd)
+    _mcp_config_paths[key] = path
+    return path
+
+
+def _work_dir_for(execution_id: str, execution: dict[str, Any]) -> str:
+    """Resolve the execution's working directory, stat-ing it once per execution."""
+    work_dir = _verified_work_dirs.get(execution_id)
+    if work_dir:
+        return work_dir
+    work_dir = (
+        execution.get("resolvedProjectPath")
+        or execution.get("projectDir")
+        or execution.get("target")
+        or "/workspace"
+    )
+    if not os.path.isdir(work_dir):
+        work_dir = "/workspace"
+    _verified_work_dirs[execution_id] = work_dir
+    return work_dir
+
+
+def release_mcp_configs(execution_id: str) -> None:
+    """Delete the MCP config files written for an execution."""
+    for key in [k for k in _mcp_config_paths if k[1] == execution_id]:
+        try:
+            os.unlink(_mcp_config_paths.pop(key))
+        except OSError:
+            pass
+
+
+@store.on_execution_released
+def _release_execution(execution_id: str) -> None:
+    """Drop the per-execution launch state of an execution evicted from the store."""
+    _verified_work_dirs.pop(execution_id, None)
+    release_mcp_configs(execution_id)
+
+
+async def _terminate(process: asyncio.subprocess.Process) -> None:
+    """Stop a process with SIGTERM, escalating to SIGKILL after a grace period."""
+    if process.returncode is not None:
+        return
+    try:
+        process.terminate()
+        await asyncio.wait_for(process.wait(), timeout=_TERMINATE_GRACE)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+    except ProcessLookupError:
+        pass
+
+
+async def _run_to_completion(
+    process: asyncio.subprocess.Process,
+    read_stdout: Any,
+    timeout: float,
+    stdin_data: bytes = b"",
+) -> tuple[bool, bytes]:
+    """Feed stdin, drain stdout and stderr and wait for exit under a single deadline.
+
+    *stdin_data* is written alongside the readers, so a child that fills
+    its output pipe before reading all of it cannot deadlock the launch.
+    Returns ``(timed_out, stderr_bytes)``; only the first
+    ``_STDERR_KEEP_BYTES`` of stderr are kept, the rest is drained and
+    dropped. On timeout the process is terminated and stderr is discarded.
+    """
+
+    async def write_stdin() -> None:
+        if process.stdin is None:
+            return
+        try:
+            process.stdin.write(stdin_data)
+            await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # CLI exited early; its exit code and stderr report why
+        finally:
+            process.stdin.close()
+
+    async def read_stderr() -> bytes:
+        if process.stderr is None:
+            return b""
+        kept = bytearray()
+        while chunk := await process.stderr.read(65536):
+            if len(kept) < _STDERR_KEEP_BYTES:
+                kept += chunk[:_STDERR_KEEP_BYTES - len(kept)]
+        return bytes(kept)
+
+    try:
+        async with asyncio.timeout(timeout), asyncio.TaskGroup() as tg:
+            tg.create_task(write_stdin())
+            tg.create_task(read_stdout)
+            stderr_task = tg.create_task(read_stderr())
+            tg.create_task(process.wait())
+    except asyncio.TimeoutError:
+        await _terminate(process)
+        return True, b""
+    except ExceptionGroup as group:
+        # Surface a lone reader failure as itself, as callers expect
+        if len(group.exceptions) == 1:
+            raise group.exceptions[0] from None
+        raise
+    return False, stderr_task.result()
+
+
+async def _load_stream_line(raw: bytes) -> Any:
+    """Decode a stream-json line, returning None for plain-text output.
+
+    Only lines that start with ``{`` are parsed; large payloads are decoded
+    in the parse pool.
+    """
+    if not raw.startswith(b"{"):
+        return None
+    try:
+        if len(raw) <= _LARGE_LINE_BYTES:
+            return orjson.loads(raw)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_PARSE_EXECUTOR, orjson.loads, raw)
+    except orjson.JSONDecodeError:
+        return None
+
+
+def _split_lines(text: str) -> list[str]:
+    """Split a text block into its non-blank lines."""
+    return [line for line in text.splitlines() if line.strip()]
+
+
+def _tail(lines: collections.deque[str], n: int) -> list[str]:
+    """Return the last ``n`` entries of a deque as a list."""
+    return list(itertools.islice(lines, max(len(lines) - n, 0), None))
+
+
+async def _spawn_cli(
+    cmd: list[str],
+    cwd: str,
+    env: dict[str, str],
+) -> asyncio.subprocess.Process:
+    """Start a CLI subprocess on CPython's vfork fast path.
+
+    No preexec_fn, process-group or uid options are passed, so the child is
+    created with vfork()+exec() rather than a full fork() of the backend's
+    address space. The executable is resolved once so launches skip the
+    PATH walk. The prompt goes to stdin rather than argv; it is written by
+    :func:`_run_to_completion` alongside the output readers.
+    """
+    return await asyncio.create_subprocess_exec(
+        resolve_executable(cmd[0]),
+        *cmd[1:],
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        env=env,
+    )
+
 
 ORCHESTRATOR_SYSTEM_PROMPT = """\
 You are a speed-optimized orchestrator of a multi-agent development team. Think in waves. \
@@ -156,6 +373,52 @@ sufficient — include the actual failure output.
 """
 
 
+# Agent definition for documentation work, which has no module under agents/
+_DOCUMENTATION = {
+    "prompt": "You are a technical writer. Write clear, accurate documentation based on the codebase.",
+    "interactive": False,
+}
+
+# Role → (system prompt with the task heading appended, interactive), built once at import.
+# Non-interactive roles never ask the user and are launched without the ask_user MCP bridge.
+_ROLE_CONFIG: dict[str, tuple[str, bool]] = {
+    role: (f"{cfg['prompt']}\n\n## Your Task\n", cfg.get("interactive", True))
+    for role, cfg in {
+        "developer": DEVELOPER_PRIMARY,
+        "developer-2": DEVELOPER_SECONDARY,
+        "tester": TESTER,
+        "security-reviewer": DEVSECOPS,
+        "devsecops": DEVSECOPS,
+        "documentation": _DOCUMENTATION,
+        "business-dev": BUSINESS_DEV,
+    }.items()
+}
+
+_AGENT_TOOLS_NOTE = (
+    "You have full access to all Claude Code tools. Use whatever you need to complete "
+    "this task thoroughly. "
+)
+_AGENT_ASK_USER_NOTE = (
+    "If you need to ask the user a question, use the "
+    "mcp__orchestra__ask_user tool — it routes through the Orchestra dashboard."
+)
+_AGENT_OUTPUT_FORMAT = (
+    "\n\n"
+    "## Output Format (REQUIRED)\n"
+    "When you complete your work, end your response with these sections:\n"
+    "## SUMMARY — what you built/changed\n"
+    "## FILES MODIFIED — full paths, one per line\n"
+    "## FILES CREATED — new files, one per line\n"
+    "## ISSUES — any problems or concerns\n"
+    "## NEXT STEPS — what downstream agents should focus on\n"
+)
+# Closing instructions, keyed by whether the agent gets the ask_user bridge
+_AGENT_PROMPT_FOOTERS: dict[bool, str] = {
+    True: _AGENT_TOOLS_NOTE + _AGENT_ASK_USER_NOTE + _AGENT_OUTPUT_FORMAT,
+    False: _AGENT_TOOLS_NOTE + _AGENT_OUTPUT_FORMAT,
+}
+
+
 async def run_dynamic_execution(execution_id: str) -> None:
     """
     Launch a single Claude CLI session as the orchestrator.
@@ -174,13 +437,11 @@ async def run_dynamic_execution(execution_id: str) -> None:
     except RuntimeError as exc:
         execution["status"] = "failed"
         execution["completedAt"] = datetime.now(timezone.utc).isoformat()
-        await _broadcast_output(execution_id, f"[Sandbox] {exc}", "orchestrator")
+        await queue_output(execution_id, f"[Sandbox] {exc}", "orchestrator")
+        await flush_output(execution_id)
         sandbox_fail_msg = {"type": "complete", "status": "failed"}
-        await store.broadcast(execution_id, sandbox_fail_msg)
         # Also broadcast sandbox failure to console WebSocket
-        for conv in store.conversations.values():
-            if conv.get("activeExecutionId") == execution_id:
-                await store.broadcast_console(conv["id"], sandbox_fail_msg)
+        await store.broadcast_linked(execution_id, sandbox_fail_msg)
         return
 
     execution["status"] = "running"
@@ -188,39 +449,12 @@ async def run_dynamic_execution(execution_id: str) -> None:
     await store.broadcast(execution_id, {"type": "phase", "phase": "orchestrator", "status": "running"})
 
     # Determine working directory
-    work_dir = (
-        execution.get("resolvedProjectPath")
-        or execution.get("projectDir")
-        or execution.get("target")
-        or "/workspace"
-    )
-    if not os.path.isdir(work_dir):
-        work_dir = "/workspace"
-
-    # Build MCP config for the orchestrator session
-    mcp_bridge_path = str(Path(__file__).parent.parent / "mcp_bridge_dynamic.py")
-    mcp_config = {
-        "mcpServers": {
-            "orchestra": {
-                "command": "python",
-                "args": [mcp_bridge_path],
-                "env": {
-                    "ORCHESTRA_API_URL": f"http://127.0.0.1:{settings.PORT}",
-                    "ORCHESTRA_EXECUTION_ID": execution_id,
-                    "ORCHESTRA_INTERNAL_TOKEN": store.internal_api_token,
-                },
-            }
-        }
-    }
+    work_dir = _work_dir_for(execution_id, execution)
 
     mcp_config_path = ""
     try:
-        # Write MCP config to temp file
-        fd, mcp_config_path = tempfile.mkstemp(suffix=".json", prefix="orchestra-mcp-")
-        mcp_config_file = os.fdopen(fd, "w")
-        json.dump(mcp_config, mcp_config_file)
-        mcp_config_file.close()
-        os.chmod(mcp_config_path, 0o600)
+        # MCP config for the orchestrator session (reused by its agents' launches)
+        mcp_config_path = _mcp_config_for("mcp_bridge_dynamic.py", execution_id)
 
         task = execution.get("task", "")
         model = execution.get("model", settings.DEFAULT_MODEL)
@@ -233,17 +467,13 @@ async def run_dynamic_execution(execution_id: str) -> None:
         )
 
         cmd = [
-            "claude",
-            "-p", full_prompt,
-            "--output-format", "stream-json",
-            "--verbose",
+            *_CLI_ARGS_PREFIX,
             "--model", model,
             "--mcp-config", mcp_config_path,
             "--dangerously-skip-permissions",
         ]
 
-        # Unset CLAUDECODE to avoid nested session detection
-        env = {**os.environ, "CLAUDECODE": ""}
+        env = cli_env()
 
         # Docker-wrap if running on bare metal with Docker available
         if exec_mode == "docker-wrap":
@@ -251,29 +481,36 @@ async def run_dynamic_execution(execution_id: str) -> None:
             if not await ensure_image(execution_id):
                 execution["status"] = "failed"
                 execution["completedAt"] = datetime.now(timezone.utc).isoformat()
-                await _broadcast_output(execution_id, "[Docker] Failed to build agent image", "orchestrator")
+                await queue_output(execution_id, "[Docker] Failed to build agent image", "orchestrator")
+                await flush_output(execution_id)
                 docker_fail_msg = {"type": "complete", "status": "failed"}
-                await store.broadcast(execution_id, docker_fail_msg)
                 # Also broadcast Docker failure to console WebSocket
-                for conv in store.conversations.values():
-                    if conv.get("activeExecutionId") == execution_id:
-                        await store.broadcast_console(conv["id"], docker_fail_msg)
+                await store.broadcast_linked(execution_id, docker_fail_msg)
                 return
-            cmd, env, work_dir = wrap_command_in_docker(cmd, env, work_dir, mcp_config_path)
+            cmd, env, work_dir = wrap_command_in_docker(
+                cmd, env, work_dir, mcp_config_path, stdin_prompt=True,
+            )
 
         print(f"[DYNAMIC] Launching Claude CLI: model={execution.get('model')}, cwd={work_dir}", flush=True)
         print(f"[DYNAMIC] Command: {' '.join(cmd[:8])}...", flush=True)
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=work_dir,
-            env=env,
-        )
+        process = await _spawn_cli(cmd, work_dir, env)
         print(f"[DYNAMIC] Claude CLI started (pid={process.pid})", flush=True)
 
-        output_lines: list[str] = []
+        output_lines: collections.deque[str] = collections.deque(maxlen=_OUTPUT_LINES_CAP)
+        lines_total = 0  # lines ever recorded (output_lines is capped)
+        lines_scanned = 0  # lines already checked for findings
+
+        def record(line: str) -> None:
+            nonlocal lines_total
+            output_lines.append(line)
+            lines_total += 1
+
+        def record_many(lines: list[str]) -> None:
+            nonlocal lines_total
+            output_lines.extend(lines)
+            lines_total += len(lines)
+
         stream_stats: dict[str, Any] = {
             "total_lines": 0,
             "json_msgs": 0,
@@ -283,27 +520,24 @@ async def run_dynamic_execution(execution_id: str) -> None:
         }
 
         async def read_stream() -> None:
-            nonlocal stream_stats
+            nonlocal stream_stats, lines_scanned
             assert process.stdout is not None
-            while True:
-                line = await process.stdout.readline()
-                if not line:
-                    break
-                text = line.decode("utf-8", errors="replace").strip()
-                if not text:
+            async for line in process.stdout:
+                raw = line.strip()
+                if not raw:
                     continue
 
                 stream_stats["total_lines"] += 1
 
-                try:
-                    msg = json.loads(text)
-                except json.JSONDecodeError:
+                msg = await _load_stream_line(raw)
+                if msg is None:
                     # Plain text output
+                    text = raw.decode("utf-8", errors="replace")
                     stream_stats["plain_text"] += 1
                     logger.info("[read_stream] Plain text: %s", text[:100])
-                    output_lines.append(text)
+                    record(text)
                     stream_stats["broadcast_calls"] += 1
-                    await _broadcast_output(execution_id, text, "orchestrator")
+                    await queue_output(execution_id, text, "orchestrator")
                     continue
 
                 stream_stats["json_msgs"] += 1
@@ -322,11 +556,10 @@ async def run_dynamic_execution(execution_id: str) -> None:
                     )
                     for block in content_blocks:
                         if block.get("type") == "text":
-                            for line_text in block["text"].split("\n"):
-                                if line_text.strip():
-                                    output_lines.append(line_text)
-                                    stream_stats["broadcast_calls"] += 1
-                                    await _broadcast_output(execution_id, line_text, "orchestrator")
+                            lines = _split_lines(block["text"])
+                            record_many(lines)
+                            stream_stats["broadcast_calls"] += 1
+                            await queue_output_many(execution_id, lines, "orchestrator")
                         elif block.get("type") == "tool_use":
                             tool_name = block.get("name", "")
                             tool_input = block.get("input", {})
@@ -337,45 +570,42 @@ async def run_dynamic_execution(execution_id: str) -> None:
                                     f"{tool_input.get('name', 'unnamed')} — "
                                     f"{tool_input.get('task', '')[:100]}"
                                 )
-                                output_lines.append(agent_info)
+                                record(agent_info)
                                 stream_stats["broadcast_calls"] += 1
-                                await _broadcast_output(execution_id, agent_info, "orchestrator")
+                                await queue_output(execution_id, agent_info, "orchestrator")
 
                 elif msg_type == "result":
                     # Final result
                     result_text = msg.get("result", "")
                     if isinstance(result_text, str):
                         logger.info("[read_stream] result: text length=%d", len(result_text))
-                        for line_text in result_text.split("\n"):
-                            if line_text.strip():
-                                output_lines.append(line_text)
-                                stream_stats["broadcast_calls"] += 1
-                                await _broadcast_output(execution_id, line_text, "orchestrator")
-
-                    # Check for findings in recent output
-                    for ol in output_lines[-20:]:
-                        finding = parse_finding(ol, execution_id)
-                        if finding:
+                        lines = _split_lines(result_text)
+                        record_many(lines)
+                        stream_stats["broadcast_calls"] += 1
+                        await queue_output_many(execution_id, lines, "orchestrator")
+
+                    # Check recent output for findings, skipping lines already scanned.
+                    # At most 20 short lines: scanned inline, since the prefilter
+                    # rejects most of them faster than a thread hand-off
+                    fresh = min(lines_total - lines_scanned, 20)
+                    lines_scanned = lines_total
+                    if fresh:
+                        for _, finding in iter_findings(_tail(output_lines, fresh), execution_id):
                             store.findings[finding["id"]] = finding
                             execution.setdefault("findings", []).append(finding["id"])
 
-        try:
-            await asyncio.wait_for(read_stream(), timeout=ORCHESTRATOR_TIMEOUT)
-        except asyncio.TimeoutError:
-            process.kill()
-            output_lines.append("[Orchestrator timed out after 30 minutes]")
-            await _broadcast_output(execution_id, "[Orchestrator timed out]", "orchestrator")
+        timed_out, stderr_bytes = await _run_to_completion(
+            process, read_stream(), ORCHESTRATOR_TIMEOUT, full_prompt.encode("utf-8"),
+        )
+        if timed_out:
+            record("[Orchestrator timed out after 30 minutes]")
+            await queue_output(execution_id, "[Orchestrator timed out]", "orchestrator")
 
         print(f"[DYNAMIC] Stream stats: {stream_stats}", flush=True)
 
-        await process.wait()
-
         # Determine final status
         return_code = process.returncode
-        stderr_output = ""
-        if process.stderr:
-            stderr_bytes = await process.stderr.read()
-            stderr_output = stderr_bytes.decode("utf-8", errors="replace").strip()
+        stderr_output = stderr_bytes.decode("utf-8", errors="replace").strip()
         status = "completed" if return_code == 0 else "failed"
         execution["status"] = status
         execution["completedAt"] = datetime.now(timezone.utc).isoformat()
@@ -389,44 +619,43 @@ async def run_dynamic_execution(execution_id: str) -> None:
             print(f"[DYNAMIC] stderr (first 1000 chars): {stderr_output[:1000]}", flush=True)
         if return_code != 0:
             print(f"[DYNAMIC] Non-zero exit — last 5 output lines: "
-                  f"{output_lines[-5:] if output_lines else '(none)'}", flush=True)
+                  f"{_tail(output_lines, 5) if output_lines else '(none)'}", flush=True)
             error_detail = f"[Orchestrator] Process exited with code {return_code}"
             if stderr_output:
                 error_detail += f": {stderr_output[:200]}"
-            await _broadcast_output(execution_id, error_detail, "orchestrator")
+            await queue_output(execution_id, error_detail, "orchestrator")
 
-        # Collect all dynamic agent file modifications
-        all_files: list[str] = []
-        for agent in store.dynamic_agents.get(execution_id, {}).values():
-            all_files.extend(agent.get("filesModified", []))
+        # Maintained per tool call by _track_file_activity (ordered, de-duplicated)
+        all_files = list(store.files_modified.get(execution_id, ()))
 
         complete_msg = {
             "type": "complete",
             "status": status,
-            "filesModified": list(set(all_files)),
+            "filesModified": all_files,
         }
         print(f"[DYNAMIC] Broadcasting completion: status={status}, output_lines={len(output_lines)}, files={len(all_files)}", flush=True)
-        await store.broadcast(execution_id, complete_msg)
+        await flush_output(execution_id)
         # Also broadcast completion to console WebSocket
-        for conv in store.conversations.values():
-            if conv.get("activeExecutionId") == execution_id:
-                await store.broadcast_console(conv["id"], complete_msg)
-                print(f"[DYNAMIC] Broadcast completion to console conv={conv['id']}", flush=True)
-                # Add a result summary message to the conversation
-                summary = "\n".join(output_lines[-10:]) if output_lines else "Execution completed."
-                response_msg = {
-                    "id": f"msg-{uuid.uuid4().hex[:8]}",
-                    "role": "orchestra",
-                    "contentType": "text",
-                    "text": summary,
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                    "executionRef": execution_id,
-                }
+        await store.broadcast_linked(execution_id, complete_msg)
+        for conv_id in store.conversations_for_execution(execution_id):
+            print(f"[DYNAMIC] Broadcast completion to console conv={conv_id}", flush=True)
+            # Add a result summary message to the conversation
+            summary = "\n".join(_tail(output_lines, 10)) if output_lines else "Execution completed."
+            response_msg = {
+                "id": f"msg-{secrets.token_hex(4)}",
+                "role": "orchestra",
+                "contentType": "text",
+                "text": summary,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "executionRef": execution_id,
+            }
+            conv = store.conversations.get(conv_id)
+            if conv is not None:
                 conv["messages"].append(response_msg)
-                await store.broadcast_console(conv["id"], {
-                    "type": "conversation-update",
-                    "message": response_msg,
-                })
+            await store.broadcast_console(conv_id, {
+                "type": "conversation-update",
+                "message": response_msg,
+            })
 
     except FileNotFoundError:
         print("[DYNAMIC] Claude CLI not found — will fall back", flush=True)
@@ -441,16 +670,15 @@ async def run_dynamic_execution(execution_id: str) -> None:
         execution["status"] = "failed"
         execution["completedAt"] = datetime.now(timezone.utc).isoformat()
         error_text = f"[Orchestrator error] {type(exc).__name__}: {exc}"
-        await _broadcast_output(execution_id, error_text, "orchestrator")
+        await queue_output(execution_id, error_text, "orchestrator")
+        await flush_output(execution_id)
         error_complete_msg = {"type": "complete", "status": "failed"}
-        await store.broadcast(execution_id, error_complete_msg)
         # Also broadcast failure to console WebSocket
-        for conv in store.conversations.values():
-            if conv.get("activeExecutionId") == execution_id:
-                await store.broadcast_console(conv["id"], error_complete_msg)
+        await store.broadcast_linked(execution_id, error_complete_msg)
     finally:
-        if mcp_config_path and os.path.exists(mcp_config_path):
-            os.unlink(mcp_config_path)
+        await flush_output(execution_id)
+        release_mcp_configs(execution_id)
+        _verified_work_dirs.pop(execution_id, None)
         # Clean up rewritten Docker MCP config if docker-wrap was used
         if exec_mode == "docker-wrap":
             from backend.services.docker_runner import cleanup_rewritten_mcp_config
@@ -493,32 +721,15 @@ async def launch_agent_subprocess(execution_id: str, agent_id: str) -> None:
     })
 
     execution = store.executions.get(execution_id, {})
-    work_dir = (
-        execution.get("resolvedProjectPath")
-        or execution.get("projectDir")
-        or execution.get("target")
-        or "/workspace"
-    )
-    if not os.path.isdir(work_dir):
-        work_dir = "/workspace"
+    work_dir = _work_dir_for(execution_id, execution)
 
     model = agent.get("model") or execution.get("model", settings.DEFAULT_MODEL)
 
     # Build agent prompt based on role — use rich prompts from agents module
-    role_prompts = {
-        "developer": DEVELOPER_PRIMARY["prompt"],
-        "developer-2": DEVELOPER_SECONDARY["prompt"],
-        "tester": TESTER["prompt"],
-        "security-reviewer": DEVSECOPS["prompt"],
-        "devsecops": DEVSECOPS["prompt"],
-        "documentation": (
-            "You are a technical writer. Write clear, accurate documentation based on the codebase."
-        ),
-        "business-dev": BUSINESS_DEV["prompt"],
-    }
-
-    system_prompt = role_prompts.get(agent["role"])
-    if not system_prompt:
+    role_config = _ROLE_CONFIG.get(agent["role"])
+    if role_config:
+        prompt_head, interactive = role_config
+    else:
         # Check store for a custom agent matching this role
         custom_agent = store.agents.get(agent["role"])
         if custom_agent and custom_agent.get("isCustom"):
@@ -531,67 +742,29 @@ async def launch_agent_subprocess(execution_id: str, agent_id: str) -> None:
                 system_prompt += f"\n\nYour capabilities: {caps}"
         else:
             system_prompt = f"You are a {agent['role']} specialist. Complete the assigned task thoroughly."
+        prompt_head = f"{system_prompt}\n\n## Your Task\n"
+        interactive = True
 
     # Enrich prompt with project context
     from backend.services.project_context import build_project_context
     project_ctx = build_project_context(work_dir)
 
-    full_prompt = (
-        f"{system_prompt}\n\n"
-        f"## Your Task\n{agent['task']}\n\n"
-        f"## Working Directory\n{work_dir}\n\n"
-    )
+    prompt_parts = [prompt_head, agent["task"], f"\n\n## Working Directory\n{work_dir}\n\n"]
     if project_ctx:
-        full_prompt += f"{project_ctx}\n\n"
-    full_prompt += (
-        "You have full access to all Claude Code tools. Use whatever you need to complete "
-        "this task thoroughly. If you need to ask the user a question, use the "
-        "mcp__orchestra__ask_user tool — it routes through the Orchestra dashboard.\n\n"
-        "## Output Format (REQUIRED)\n"
-        "When you complete your work, end your response with these sections:\n"
-        "## SUMMARY — what you built/changed\n"
-        "## FILES MODIFIED — full paths, one per line\n"
-        "## FILES CREATED — new files, one per line\n"
-        "## ISSUES — any problems or concerns\n"
-        "## NEXT STEPS — what downstream agents should focus on\n"
-    )
+        prompt_parts.append(f"{project_ctx}\n\n")
+    prompt_parts.append(_AGENT_PROMPT_FOOTERS[interactive])
+    full_prompt = "".join(prompt_parts)
 
     agent_mcp_config_path = ""
     try:
-        # Agent gets the basic ask_user MCP bridge (not spawn_agent)
-        mcp_bridge_path = str(Path(__file__).parent.parent / "mcp_bridge.py")
-        mcp_config: dict[str, Any] = {
-            "mcpServers": {
-                "orchestra": {
-                    "command": "python",
-                    "args": [mcp_bridge_path],
-                    "env": {
-                        "ORCHESTRA_API_URL": f"http://127.0.0.1:{settings.PORT}",
-                        "ORCHESTRA_EXECUTION_ID": execution_id,
-                        "ORCHESTRA_INTERNAL_TOKEN": store.internal_api_token,
-                    },
-                }
-            }
-        }
+        cmd = [*_CLI_ARGS_PREFIX, "--model", model, "--dangerously-skip-permissions"]
 
-        fd, agent_mcp_config_path = tempfile.mkstemp(suffix=".json", prefix=f"agent-{agent_id}-")
-        mcp_config_file = os.fdopen(fd, "w")
-        json.dump(mcp_config, mcp_config_file)
-        mcp_config_file.close()
-        os.chmod(agent_mcp_config_path, 0o600)
-
-        cmd = [
-            "claude",
-            "-p", full_prompt,
-            "--output-format", "stream-json",
-            "--verbose",
-            "--model", model,
-            "--mcp-config", agent_mcp_config_path,
-            "--dangerously-skip-permissions",
-        ]
+        if interactive:
+            # Agent gets the basic ask_user MCP bridge (not spawn_agent)
+            agent_mcp_config_path = _mcp_config_for("mcp_bridge.py", execution_id)
+            cmd[-1:-1] = ["--mcp-config", agent_mcp_config_path]
 
-        # Unset CLAUDECODE to avoid nested session detection
-        env = {**os.environ, "CLAUDECODE": ""}
+        env = cli_env()
 
         # Docker-wrap if needed
         if exec_mode == "docker-wrap":
@@ -606,29 +779,22 @@ async def launch_agent_subprocess(execution_id: str, agent_id: str) -> None:
                     "agentId": agent_id, "status": "failed", "filesModified": [],
                 })
                 return
-            cmd, env, work_dir = wrap_command_in_docker(cmd, env, work_dir, agent_mcp_config_path)
-
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=work_dir,
-            env=env,
-        )
+            cmd, env, work_dir = wrap_command_in_docker(
+                cmd, env, work_dir, agent_mcp_config_path, stdin_prompt=True,
+            )
+
+        process = await _spawn_cli(cmd, work_dir, env)
 
         async def read_agent_stream() -> None:
             assert process.stdout is not None
-            while True:
-                line = await process.stdout.readline()
-                if not line:
-                    break
-                text = line.decode("utf-8", errors="replace").strip()
-                if not text:
+            async for line in process.stdout:
+                raw = line.strip()
+                if not raw:
                     continue
 
-                try:
-                    msg = json.loads(text)
-                except json.JSONDecodeError:
+                msg = await _load_stream_line(raw)
+                if msg is None:
+                    text = raw.decode("utf-8", errors="replace")
                     agent["output"].append(text)
                     await _broadcast_agent_event(execution_id, agent_id, "agent-output", {
                         "agentId": agent_id,
@@ -641,13 +807,13 @@ async def launch_agent_subprocess(execution_id: str, agent_id: str) -> None:
                 if msg_type == "assistant":
                     for block in msg.get("message", {}).get("content", []):
                         if block.get("type") == "text":
-                            for lt in block["text"].split("\n"):
-                                if lt.strip():
-                                    agent["output"].append(lt)
-                                    await _broadcast_agent_event(
-                                        execution_id, agent_id, "agent-output",
-                                        {"agentId": agent_id, "line": lt},
-                                    )
+                            lines = _split_lines(block["text"])
+                            agent["output"].extend(lines)
+                            for lt in lines:
+                                await _broadcast_agent_event(
+                                    execution_id, agent_id, "agent-output",
+                                    {"agentId": agent_id, "line": lt},
+                                )
                         elif block.get("type") == "tool_use":
                             tool_name = block.get("name", "")
                             tool_input = block.get("input", {})
@@ -659,21 +825,22 @@ async def launch_agent_subprocess(execution_id: str, agent_id: str) -> None:
                 elif msg_type == "result":
                     result_text = msg.get("result", "")
                     if isinstance(result_text, str):
-                        for lt in result_text.split("\n"):
-                            if lt.strip():
-                                agent["output"].append(lt)
-                                await _broadcast_agent_event(
-                                    execution_id, agent_id, "agent-output",
-                                    {"agentId": agent_id, "line": lt},
-                                )
+                        lines = _split_lines(result_text)
+                        agent["output"].extend(lines)
+                        for lt in lines:
+                            await _broadcast_agent_event(
+                                execution_id, agent_id, "agent-output",
+                                {"agentId": agent_id, "line": lt},
+                            )
 
-        try:
-            await asyncio.wait_for(read_agent_stream(), timeout=AGENT_TIMEOUT)
-        except asyncio.TimeoutError:
-            process.kill()
+        timed_out, stderr_bytes = await _run_to_completion(
+            process, read_agent_stream(), AGENT_TIMEOUT, full_prompt.encode("utf-8"),
+        )
+        if timed_out:
             agent["output"].append(f"[{agent['name']} timed out after 15 minutes]")
-
-        await process.wait()
+        elif process.returncode != 0 and stderr_bytes:
+            stderr_text = stderr_bytes.decode("utf-8", errors="replace").strip()
+            print(f"[DYNAMIC] Agent {agent_id} stderr: {stderr_text[:500]}", flush=True)
 
         agent["status"] = "completed" if process.returncode == 0 else "failed"
         agent["completedAt"] = datetime.now(timezone.utc).isoformat()
@@ -693,8 +860,6 @@ async def launch_agent_subprocess(execution_id: str, agent_id: str) -> None:
         agent["output"].append(f"[Agent error] {type(exc).__name__}: {exc}")
         agent["completedAt"] = datetime.now(timezone.utc).isoformat()
     finally:
-        if agent_mcp_config_path and os.path.exists(agent_mcp_config_path):
-            os.unlink(agent_mcp_config_path)
         # Clean up rewritten Docker MCP config if docker-wrap was used
         if exec_mode == "docker-wrap":
             from backend.services.docker_runner import cleanup_rewritten_mcp_config
@@ -733,16 +898,23 @@ def _track_file_activity(
         return
 
     file_path = tool_input.get("file_path") or tool_input.get("path") or tool_input.get("pattern", "")
-    if not file_path:
+    if not file_path or not isinstance(file_path, str):
         return
+    # The same paths recur across many activity records; keep one copy of each
+    file_path = sys.intern(file_path)
 
     agent = store.dynamic_agents.get(execution_id, {}).get(agent_id)
     if agent:
         if action in ("edit", "create"):
-            if file_path not in agent["filesModified"]:
+            seen = agent["_filesModifiedSet"]
+            if file_path not in seen:
+                seen.add(file_path)
                 agent["filesModified"].append(file_path)
+            store.files_modified.setdefault(execution_id, {}).setdefault(file_path, None)
         elif action == "read":
-            if file_path not in agent["filesRead"]:
+            seen = agent["_filesReadSet"]
+            if file_path not in seen:
+                seen.add(file_path)
                 agent["filesRead"].append(file_path)
 
     activity = {
@@ -750,45 +922,15 @@ def _track_file_activity(
         "action": action,
         "agentId": agent_id,
         "agentName": agent_name,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "tsNs": time.time_ns(),  # formatted lazily by GET /files
     }
 
     if execution_id not in store.file_activities:
         store.file_activities[execution_id] = []
     store.file_activities[execution_id].append(activity)
 
-    # Broadcast file activity (fire-and-forget)
-    try:
-        loop = asyncio.get_running_loop()
-        loop.create_task(store.broadcast(execution_id, {"type": "file-activity", **activity}))
-    except RuntimeError:
-        pass
-
-
-async def _broadcast_output(execution_id: str, text: str, phase: str) -> None:
-    """Broadcast output line to execution and linked console WebSockets."""
-    msg = {"type": "output", "line": text, "phase": phase}
-    await store.broadcast(execution_id, msg)
-    exec_ws_count = len(store.websocket_connections.get(execution_id, set()))
-    logger.info("_broadcast_output: exec=%s → %d exec WS client(s)", execution_id, exec_ws_count)
-    # Also broadcast as console-text to linked conversations
-    console_msg = {
-        "type": "console-text",
-        "text": text,
-        "messageId": f"out-{uuid.uuid4().hex[:8]}",
-    }
-    sent_to = 0
-    for conv in store.conversations.values():
-        if conv.get("activeExecutionId") == execution_id:
-            await store.broadcast_console(conv["id"], console_msg)
-            sent_to += 1
-    if sent_to > 0:
-        logger.info("_broadcast_output: exec=%s → %d conversation(s), text=%s", execution_id, sent_to, text[:80])
-    else:
-        logger.warning(
-            "_broadcast_output: no linked conversation found for exec %s",
-            execution_id,
-        )
+    # Broadcast file activity (batched by store.run_activity_broadcaster)
+    store.queue_activity(execution_id, activity)
 
 
 async def _broadcast_agent_event(
@@ -799,31 +941,29 @@ async def _broadcast_agent_event(
 ) -> None:
     """Broadcast agent event to execution and linked console WebSockets."""
     msg = {"type": event_type, **data}
-    await store.broadcast(execution_id, msg)
-    for conv in store.conversations.values():
-        if conv.get("activeExecutionId") == execution_id:
-            await store.broadcast_console(conv["id"], msg)
-            # Also pipe agent events as console-text so they appear in
-            # the Progress streaming output (not just the Agents tab)
-            if event_type == "agent-output" and data.get("line"):
-                await store.broadcast_console(conv["id"], {
-                    "type": "console-text",
-                    "text": data["line"],
-                    "messageId": f"agent-{uuid.uuid4().hex[:8]}",
-                })
-            elif event_type == "agent-spawn":
-                label = data.get("name") or agent_id
-                task = data.get("task", "")
-                spawn_text = f"[Agent: {label}] Starting: {task}" if task else f"[Agent: {label}] Starting..."
-                await store.broadcast_console(conv["id"], {
-                    "type": "console-text",
-                    "text": spawn_text,
-                    "messageId": f"agent-{uuid.uuid4().hex[:8]}",
-                })
-            elif event_type == "agent-complete":
-                label = data.get("name") or agent_id
-                await store.broadcast_console(conv["id"], {
-                    "type": "console-text",
-                    "text": f"[Agent: {label}] Completed",
-                    "messageId": f"agent-{uuid.uuid4().hex[:8]}",
-                })
+    await store.broadcast_linked(execution_id, msg)
+    for conv_id in store.conversations_for_execution(execution_id):
+        # Also pipe agent events as console-text so they appear in
+        # the Progress streaming output (not just the Agents tab)
+        if event_type == "agent-output" and data.get("line"):
+            await store.broadcast_console(conv_id, {
+                "type": "console-text",
+                "text": data["line"],
+                "messageId": f"agent-{secrets.token_hex(4)}",
+            })
+        elif event_type == "agent-spawn":
+            label = data.get("name") or agent_id
+            task = data.get("task", "")
+            spawn_text = f"[Agent: {label}] Starting: {task}" if task else f"[Agent: {label}] Starting..."
+            await store.broadcast_console(conv_id, {
+                "type": "console-text",
+                "text": spawn_text,
+                "messageId": f"agent-{secrets.token_hex(4)}",
+            })
+        elif event_type == "agent-complete":
+            label = data.get("name") or agent_id
+            await store.broadcast_console(conv_id, {
+                "type": "console-text",
+                "text": f"[Agent: {label}] Completed",
+                "messageId": f"agent-{secrets.token_hex(4)}",
+            })
@@ -3,16 +3,24 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import graphlib
 import os
+import secrets
 import shutil
-import uuid
-from datetime import datetime, timezone
-from typing import Any
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator
+
+import orjson
 
 from backend import store
-from backend.services.parser import parse_finding
+from backend.config import settings
+from backend.services.cli import cli_env
+from backend.services.output_batching import flush_output, queue_output, queue_output_many
+from backend.services.parser import iter_findings
 from backend.services.screenshots import capture_terminal_snapshot
+from backend.services.timestamps import now_iso
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -20,16 +28,43 @@ from backend.services.screenshots import capture_terminal_snapshot
 # ──────────────────────────────────────────────────────────────────────────────
 
 _orchestrator_available: bool | None = None
+_claude_path: str | None = None
 
 
 def _check_orchestrator_available() -> bool:
     """Check if the Claude Code CLI is available."""
-    global _orchestrator_available
+    global _orchestrator_available, _claude_path
     if _orchestrator_available is not None:
         return _orchestrator_available
-    _orchestrator_available = shutil.which("claude") is not None
+    _claude_path = shutil.which("claude")
+    _orchestrator_available = _claude_path is not None
     return _orchestrator_available
 
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Phase output retention
+# ──────────────────────────────────────────────────────────────────────────────
+
+# Lines kept in memory per step/activity; older lines are spilled to OUTPUT_LOG_DIR
+_PHASE_OUTPUT_CAP = 10_000
+_PHASE_OUTPUT_SLACK = 1_000
+OUTPUT_LOG_DIR = Path(tempfile.gettempdir()) / "orchestra-output"  # created on first spill
+
+# Lines of a finished phase's output handed to the phases that follow it
+_CONTEXT_TAIL_LINES = 200
+# execution_id → id(step) → prompt section built from that finished step's output
+_context_chunks: dict[str, dict[int, str]] = {}
+# execution_id → user task plus project context, shared by every phase's prompt
+_task_blocks: dict[str, str] = {}
+
+
+@store.on_execution_released
+def _release_execution(execution_id: str) -> None:
+    """Drop the prompt caches of an execution evicted from the store."""
+    _context_chunks.pop(execution_id, None)
+    _task_blocks.pop(execution_id, None)
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Phase → Agent mapping
 # ──────────────────────────────────────────────────────────────────────────────
@@ -56,6 +91,25 @@ PHASE_AGENTS_INFO: dict[str, dict[str, str]] = {
     "devops": {"name": "DevOps", "color": "#eab308", "icon": "Container"},
 }
 
+
+# Fixed fields of each known role's agent-spawn payload
+_AGENT_SPAWN_TEMPLATES: dict[str, dict[str, Any]] = {
+    role: {"id": role, "role": role, **info, "status": "running", "completedAt": None}
+    for role, info in PHASE_AGENTS_INFO.items()
+}
+
+
+def _agent_spawn_template(role: str) -> dict[str, Any]:
+    """Return the fixed agent-spawn fields for *role*, with neutral defaults for unknown roles."""
+    template = _AGENT_SPAWN_TEMPLATES.get(role)
+    if template is None:
+        template = {
+            "id": role, "role": role, "name": role, "color": "#6b7280", "icon": "Bot",
+            "status": "running", "completedAt": None,
+        }
+    return template
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Phase-specific prompts for the Claude Code CLI
 # ──────────────────────────────────────────────────────────────────────────────
@@ -149,6 +203,12 @@ PHASE_PROMPTS: dict[str, str] = {
     ),
 }
 
+# Phase → prompt with the task heading appended, built once at import
+_PHASE_PROMPT_HEADS: dict[str, str] = {
+    phase: f"{prompt}\n\n## Task\n" for phase, prompt in PHASE_PROMPTS.items()
+}
+_DEFAULT_PHASE_PROMPT_HEAD = "Complete this phase of the task.\n\n## Task\n"
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Simulation data (used when the real orchestrator is unavailable)
 # ──────────────────────────────────────────────────────────────────────────────
@@ -199,12 +259,20 @@ SIMULATION_LINES: dict[str, list[str]] = {
 
 async def broadcast_both(execution_id: str, message: dict) -> None:
     """Broadcast a message to both the execution WebSocket and any linked conversation console."""
-    await store.broadcast(execution_id, message)
+    # Send batched output first so clients see lines before the events that follow them
+    await flush_output(execution_id)
+    await store.broadcast_linked(execution_id, message)
+
 
-    # Find conversations with this active execution and broadcast to them
-    for conv_id, conv in store.conversations.items():
-        if conv.get("activeExecutionId") == execution_id:
-            await store.broadcast_console(conv_id, message)
+async def broadcast_transient(execution_id: str, message: dict) -> None:
+    """Broadcast a purely visual event, dropped for headless runs.
+
+    Linked conversations always get it, since their console history is
+    replayed on reconnect; otherwise it is skipped (and not buffered for
+    replay) when no execution WebSocket is connected.
+    """
+    if store.has_subscribers(execution_id) or store.conversations_for_execution(execution_id):
+        await broadcast_both(execution_id, message)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -228,7 +296,7 @@ async def run_execution(execution_id: str) -> None:
         execution = store.executions.get(execution_id)
         if execution:
             execution["status"] = "failed"
-            execution["completedAt"] = datetime.now(timezone.utc).isoformat()
+            execution["completedAt"] = now_iso()
             await broadcast_both(execution_id, {
                 "type": "complete",
                 "status": "failed",
@@ -245,7 +313,7 @@ async def run_execution(execution_id: str) -> None:
     # Store exec_mode for use by _try_real_orchestrator
     execution["_exec_mode"] = exec_mode
 
-    now = datetime.now(timezone.utc).isoformat()
+    now = now_iso()
     execution["status"] = "running"
     execution["startedAt"] = now
     await broadcast_both(execution_id, {
@@ -255,31 +323,19 @@ async def run_execution(execution_id: str) -> None:
     })
 
     try:
-        # Group pipeline steps and execute groups in parallel
-        groups: list[list[dict[str, Any]]] = []
-        current_group: list[dict[str, Any]] = []
-        current_group_idx = execution["pipeline"][0]["group"] if execution["pipeline"] else 0
-
-        for step in execution["pipeline"]:
-            if step["group"] != current_group_idx:
-                groups.append(current_group)
-                current_group = []
-                current_group_idx = step["group"]
-            current_group.append(step)
-        if current_group:
-            groups.append(current_group)
+        # Parallel phases share one MCP config; write it before any phase starts
+        if _check_orchestrator_available():
+            execution["_mcpConfigPath"] = await asyncio.to_thread(_write_mcp_config, execution_id)
 
-        for group in groups:
-            if len(group) == 1:
-                await _run_phase(execution_id, group[0])
-            else:
-                await asyncio.gather(*[
-                    _run_phase(execution_id, step) for step in group
-                ])
+        pipeline = execution["pipeline"]
+        if any("dependsOn" in step for step in pipeline):
+            await _run_pipeline_dag(execution_id, pipeline)
+        else:
+            await _run_pipeline_groups(execution_id, pipeline)
 
         # All phases completed
         execution["status"] = "completed"
-        execution["completedAt"] = datetime.now(timezone.utc).isoformat()
+        execution["completedAt"] = now_iso()
         await broadcast_both(execution_id, {"type": "complete", "status": "completed"})
 
     except Exception as exc:
@@ -287,17 +343,26 @@ async def run_execution(execution_id: str) -> None:
         print(f"[ORCH] run_execution FAILED: {exc}", flush=True)
         traceback.print_exc()
         execution["status"] = "failed"
-        execution["completedAt"] = datetime.now(timezone.utc).isoformat()
+        execution["completedAt"] = now_iso()
         # Record the error on ALL running phases (parallel execution may have multiple)
         for step in execution["pipeline"]:
             if step["status"] == "running":
                 step["status"] = "failed"
                 step["output"].append("An internal error occurred during execution.")
-                step["completedAt"] = datetime.now(timezone.utc).isoformat()
+                step["completedAt"] = now_iso()
         await broadcast_both(execution_id, {
             "type": "complete",
             "status": "failed",
         })
+    finally:
+        _context_chunks.pop(execution_id, None)
+        _task_blocks.pop(execution_id, None)
+        mcp_config_path = execution.pop("_mcpConfigPath", None)
+        if mcp_config_path is not None:
+            try:
+                await asyncio.to_thread(os.unlink, mcp_config_path)
+            except OSError:
+                pass
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -305,15 +370,129 @@ async def run_execution(execution_id: str) -> None:
 # ──────────────────────────────────────────────────────────────────────────────
 
 
-async def _run_phase(execution_id: str, step: dict[str, Any]) -> None:
-    """Execute a single pipeline phase."""
+async def _run_pipeline_groups(execution_id: str, pipeline: list[dict[str, Any]]) -> None:
+    """Run pipeline groups in order, with the steps of each group in parallel."""
+    # Split the pipeline into runs of consecutive steps sharing a group
+    groups: list[list[dict[str, Any]]] = []
+    current_group: list[dict[str, Any]] = []
+    current_group_idx = pipeline[0]["group"] if pipeline else 0
+
+    for step in pipeline:
+        if step["group"] != current_group_idx:
+            groups.append(current_group)
+            current_group = []
+            current_group_idx = step["group"]
+        current_group.append(step)
+    if current_group:
+        groups.append(current_group)
+
+    # Resolve each group's handoff targets once instead of rescanning the pipeline per phase
+    handoffs = [
+        [
+            (step["phase"], step.get("agentRole") or PHASE_AGENTS.get(step["phase"], "developer"))
+            for step in next_group
+        ]
+        for next_group in groups[1:]
+    ] + [[]]
+
+    limit = asyncio.Semaphore(settings.MAX_PARALLEL_PHASES)
+
+    async def run_bounded(step: dict[str, Any], next_agents: list[tuple[str, str]]) -> None:
+        async with limit:
+            await _run_phase(execution_id, step, next_agents)
+
+    for group, next_agents in zip(groups, handoffs):
+        if len(group) == 1:
+            await _run_phase(execution_id, group[0], next_agents)
+        else:
+            # A failing phase cancels its peers instead of leaving them running
+            async with asyncio.TaskGroup() as tg:
+                for step in group:
+                    tg.create_task(run_bounded(step, next_agents))
+
+
+def validate_dependencies(graph: dict[str, set[str]]) -> None:
+    """Raise ValueError if *graph* (phase → phases it waits for) names an unknown phase or has a cycle."""
+    unknown = set().union(*graph.values()) - graph.keys()
+    if unknown:
+        raise ValueError(f"Pipeline dependsOn references unknown phases: {sorted(unknown)}")
+    try:
+        graphlib.TopologicalSorter(graph).prepare()
+    except graphlib.CycleError as exc:
+        raise ValueError(f"Pipeline dependsOn has a cycle: {exc.args[1]}") from exc
+
+
+async def _run_pipeline_dag(execution_id: str, pipeline: list[dict[str, Any]]) -> None:
+    """Run each step as soon as every phase in its ``dependsOn`` has completed.
+
+    Steps without ``dependsOn`` start immediately. When a phase fails, every
+    phase that depends on it, directly or not, is skipped; independent
+    phases still run, and the first failure is re-raised once all have
+    settled. Raises ValueError for unknown or cyclic dependencies before
+    any phase is started.
+    """
+    graph = {step["phase"]: set(step.get("dependsOn") or ()) for step in pipeline}
+    validate_dependencies(graph)
+
+    # Handoff targets per phase, resolved once up front
+    dependents: dict[str, list[tuple[str, str]]] = {phase: [] for phase in graph}
+    for step in pipeline:
+        agent = step.get("agentRole") or PHASE_AGENTS.get(step["phase"], "developer")
+        for dep in graph[step["phase"]]:
+            dependents[dep].append((step["phase"], agent))
+
+    finished = {phase: asyncio.Event() for phase in graph}
+    failed: set[str] = set()
+    errors: list[Exception] = []
+    limit = asyncio.Semaphore(settings.MAX_PARALLEL_PHASES)
+
+    async def run_when_ready(step: dict[str, Any]) -> None:
+        phase = step["phase"]
+        try:
+            for dep in graph[phase]:
+                await finished[dep].wait()
+            if failed & graph[phase]:
+                failed.add(phase)
+                step["status"] = "skipped"
+                step["completedAt"] = now_iso()
+                await broadcast_both(execution_id, {"type": "phase", "phase": phase, "status": "skipped"})
+                return
+            try:
+                async with limit:
+                    await _run_phase(execution_id, step, dependents[phase])
+            except Exception as exc:
+                failed.add(phase)
+                errors.append(exc)
+                step["status"] = "failed"
+                await broadcast_both(execution_id, {"type": "phase", "phase": phase, "status": "failed"})
+        finally:
+            # Set even on failure, so dependents wake up and skip themselves
+            finished[phase].set()
+
+    async with asyncio.TaskGroup() as tg:
+        for step in pipeline:
+            tg.create_task(run_when_ready(step))
+    if errors:
+        raise errors[0]
+
+
+async def _run_phase(
+    execution_id: str,
+    step: dict[str, Any],
+    next_agents: list[tuple[str, str]],
+) -> None:
+    """Execute a single pipeline phase.
+
+    *next_agents* lists the ``(phase, agentRole)`` pairs of the following
+    group, used for the handoff connections broadcast when the phase ends.
+    """
     phase = step["phase"]
     agent_role = step.get("agentRole") or PHASE_AGENTS.get(phase, "developer")
 
     # Update step status
     step["status"] = "running"
     step["agentRole"] = agent_role
-    step["startedAt"] = datetime.now(timezone.utc).isoformat()
+    step["startedAt"] = now_iso()
     await broadcast_both(execution_id, {
         "type": "phase",
         "phase": phase,
@@ -324,28 +503,21 @@ async def _run_phase(execution_id: str, step: dict[str, Any]) -> None:
     _set_agent_status(agent_role, "busy", execution_id)
 
     # Broadcast agent-spawn so Office view shows agents appearing dynamically
-    agent_info = PHASE_AGENTS_INFO.get(agent_role, {})
     await broadcast_both(execution_id, {
         "type": "agent-spawn",
         "agent": {
-            "id": agent_role,
+            **_agent_spawn_template(agent_role),
             "executionId": execution_id,
-            "role": agent_role,
-            "name": agent_info.get("name", agent_role),
             "task": f"Executing {phase} phase",
-            "status": "running",
             "output": [],
             "filesModified": [],
             "filesRead": [],
-            "color": agent_info.get("color", "#6b7280"),
-            "icon": agent_info.get("icon", "Bot"),
-            "spawnedAt": datetime.now(timezone.utc).isoformat(),
-            "completedAt": None,
+            "spawnedAt": now_iso(),
         },
     })
 
     # Broadcast agent-status: working
-    await broadcast_both(execution_id, {
+    await broadcast_transient(execution_id, {
         "type": "agent-status",
         "agentRole": agent_role,
         "visualStatus": "working",
@@ -353,7 +525,7 @@ async def _run_phase(execution_id: str, step: dict[str, Any]) -> None:
     })
 
     # Broadcast orchestrator → agent connection (for office visualization)
-    await broadcast_both(execution_id, {
+    await broadcast_transient(execution_id, {
         "type": "agent-connection",
         "from": "orchestrator",
         "to": agent_role,
@@ -363,7 +535,7 @@ async def _run_phase(execution_id: str, step: dict[str, Any]) -> None:
     })
 
     # Create an activity record
-    activity_id = f"act-{uuid.uuid4().hex[:8]}"
+    activity_id = f"act-{secrets.token_hex(4)}"
     execution = store.executions[execution_id]
     activity: dict[str, Any] = {
         "id": activity_id,
@@ -371,7 +543,7 @@ async def _run_phase(execution_id: str, step: dict[str, Any]) -> None:
         "action": f"Executing {phase} phase",
         "output": [],
         "filesModified": [],
-        "startedAt": datetime.now(timezone.utc).isoformat(),
+        "startedAt": now_iso(),
         "completedAt": None,
         "status": "running",
     }
@@ -381,7 +553,7 @@ async def _run_phase(execution_id: str, step: dict[str, Any]) -> None:
         # Only try the real orchestrator if dependencies are available
         cli_available = _check_orchestrator_available()
         print(f"[ORCH] Phase {phase}: CLI available={cli_available}, "
-              f"claude path={shutil.which('claude')}", flush=True)
+              f"claude path={_claude_path}", flush=True)
         if cli_available:
             try:
                 success = await asyncio.wait_for(
@@ -389,13 +561,10 @@ async def _run_phase(execution_id: str, step: dict[str, Any]) -> None:
                     timeout=900,  # 15 minutes per phase
                 )
             except asyncio.TimeoutError:
-                step["output"].append(f"Phase {phase} timed out after 15 minutes.")
-                activity["output"].append(f"Phase {phase} timed out after 15 minutes.")
-                await broadcast_both(execution_id, {
-                    "type": "output",
-                    "line": f"Phase {phase} timed out after 15 minutes.",
-                    "phase": phase,
-                })
+                _record_output(execution_id, step, activity, [f"Phase {phase} timed out after 15 minutes."])
+                await queue_output(
+                    execution_id, f"Phase {phase} timed out after 15 minutes.", phase,
+                )
                 success = True  # Don't fall back to simulation
             print(f"[ORCH] Phase {phase}: _try_real_orchestrator returned {success}",
                   flush=True)
@@ -410,30 +579,40 @@ async def _run_phase(execution_id: str, step: dict[str, Any]) -> None:
         snapshot = await capture_terminal_snapshot(
             execution_id, phase, step["output"],
         )
+
+        # Mark phase and agent as completed before announcing it
+        step["status"] = "completed"
+        step["completedAt"] = now_iso()
+        # Output is final now; build its handoff section once for later phases
+        if step["output"]:
+            _context_chunks.setdefault(execution_id, {})[id(step)] = _context_chunk(step)
+
+        activity["status"] = "completed"
+        activity["completedAt"] = now_iso()
+
+        _set_agent_status(agent_role, "idle", None)
+        _increment_agent_tasks(agent_role)
+
+        # Send the phase's remaining output, then the closing events in order
+        await flush_output(execution_id)
         await broadcast_both(execution_id, {
             "type": "screenshot",
             "screenshot": snapshot,
         })
 
-        # Broadcast agent-connection handoff to next group
-        pipeline = execution["pipeline"]
-        current_group_idx = step.get("group", 0)
-        next_group_steps = [
-            s for s in pipeline if s.get("group", 0) == current_group_idx + 1
-        ]
-        for next_step in next_group_steps:
-            next_agent = next_step.get("agentRole") or PHASE_AGENTS.get(next_step["phase"], "developer")
-            await broadcast_both(execution_id, {
+        # Agent-connection handoff to next group
+        for next_phase, next_agent in next_agents:
+            await broadcast_transient(execution_id, {
                 "type": "agent-connection",
                 "from": agent_role,
                 "to": next_agent,
-                "label": f"{phase} \u2192 {next_step['phase']}",
+                "label": f"{phase} \u2192 {next_phase}",
                 "active": True,
                 "dataFlow": "handoff",
             })
 
         # Deactivate orchestrator → agent connection
-        await broadcast_both(execution_id, {
+        await broadcast_transient(execution_id, {
             "type": "agent-connection",
             "from": "orchestrator",
             "to": agent_role,
@@ -441,25 +620,12 @@ async def _run_phase(execution_id: str, step: dict[str, Any]) -> None:
             "active": False,
             "dataFlow": "broadcast",
         })
-
-        # Broadcast agent-status: done
-        await broadcast_both(execution_id, {
+        await broadcast_transient(execution_id, {
             "type": "agent-status",
             "agentRole": agent_role,
             "visualStatus": "done",
             "currentTask": "",
         })
-
-        # Mark phase and agent as completed
-        step["status"] = "completed"
-        step["completedAt"] = datetime.now(timezone.utc).isoformat()
-
-        activity["status"] = "completed"
-        activity["completedAt"] = datetime.now(timezone.utc).isoformat()
-
-        _set_agent_status(agent_role, "idle", None)
-        _increment_agent_tasks(agent_role)
-
         await broadcast_both(execution_id, {
             "type": "phase",
             "phase": phase,
@@ -467,6 +633,28 @@ async def _run_phase(execution_id: str, step: dict[str, Any]) -> None:
         })
 
 
+def _context_chunk(step: dict[str, Any]) -> str:
+    """Build the prompt section carrying the tail of *step*'s output."""
+    return (
+        f"## {step['phase'].title()} Phase Output\n"
+        + "\n".join(step["output"][-_CONTEXT_TAIL_LINES:])
+    )
+
+
+def _context_steps(pipeline: list[dict[str, Any]], step: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Yield the earlier steps with output whose results feed *step*'s prompt."""
+    current_group = step.get("group", 0)
+    depends_on = step.get("dependsOn")
+    for prev_step in pipeline:
+        if depends_on is not None:
+            if prev_step["phase"] not in depends_on:
+                continue
+        elif prev_step.get("group", 0) >= current_group:
+            break
+        if prev_step["output"]:
+            yield prev_step
+
+
 async def _try_real_orchestrator(
     execution_id: str,
     phase: str,
@@ -478,75 +666,55 @@ async def _try_real_orchestrator(
     if execution is None:
         return False
 
-    claude_path = shutil.which("claude")
+    claude_path = _claude_path if _check_orchestrator_available() else None
     if not claude_path:
         print("[ORCH] _try_real_orchestrator: claude binary NOT FOUND on PATH", flush=True)
         return False
 
-    # Build the prompt: phase instructions + user task + previous context
-    phase_prompt = PHASE_PROMPTS.get(phase, "Complete this phase of the task.")
-    user_task = execution.get("task", "")
-
-    # Gather context from previous groups (not parallel peers)
-    current_group = step.get("group", 0)
-    prev_context_parts: list[str] = []
-    for prev_step in execution["pipeline"]:
-        if prev_step.get("group", 0) >= current_group:
-            break
-        if prev_step["output"]:
-            prev_context_parts.append(
-                f"## {prev_step['phase'].title()} Phase Output\n"
-                + "\n".join(prev_step["output"][-200:])
-            )
-    prev_context = "\n\n".join(prev_context_parts)
+    # Gather context from previous groups (not parallel peers), or from the
+    # step's direct dependencies when the pipeline declares dependsOn
+    chunks = _context_chunks.get(execution_id, {})
+    prev_context = "\n\n".join(
+        chunks.get(id(prev_step)) or _context_chunk(prev_step)
+        for prev_step in _context_steps(execution["pipeline"], step)
+    )
 
     # Determine working directory — use resolvedProjectPath if set,
     # otherwise fall back to the current process working directory.
     # (In Docker the app lives at /app, in devcontainer at /workspace)
-    resolved_path = execution.get("resolvedProjectPath", "")
-    if resolved_path and os.path.isdir(resolved_path):
-        cwd = resolved_path
-    else:
-        cwd = os.getcwd()
-
-    # Enrich with project context
-    from backend.services.project_context import build_project_context
-    project_ctx = build_project_context(cwd)
-
-    full_prompt = f"{phase_prompt}\n\n## Task\n{user_task}"
-    if project_ctx:
-        full_prompt += f"\n\n{project_ctx}"
+    # Resolved once per execution; every phase runs in the same directory.
+    cwd = execution.get("_resolvedCwd")
+    if cwd is None:
+        resolved_path = execution.get("resolvedProjectPath", "")
+        if resolved_path and os.path.isdir(resolved_path):
+            cwd = resolved_path
+        else:
+            cwd = os.getcwd()
+        execution["_resolvedCwd"] = cwd
+
+    # Build the prompt: phase instructions + user task + project context +
+    # previous context. The task block is the same for every phase of the run.
+    task_block = _task_blocks.get(execution_id)
+    if task_block is None:
+        from backend.services.project_context import build_project_context
+        project_ctx = build_project_context(cwd)
+        task_block = execution.get("task", "")
+        if project_ctx:
+            task_block = f"{task_block}\n\n{project_ctx}"
+        _task_blocks[execution_id] = task_block
+
+    prompt_parts = [_PHASE_PROMPT_HEADS.get(phase, _DEFAULT_PHASE_PROMPT_HEAD), task_block]
     if prev_context:
-        full_prompt += f"\n\n## Context from Previous Phases\n{prev_context}"
+        prompt_parts += ("\n\n## Context from Previous Phases\n", prev_context)
+    full_prompt = "".join(prompt_parts)
 
     model = execution.get("model", "sonnet")
 
-    # Create temporary MCP config for the ask_user bridge
-    import tempfile
-    mcp_bridge_path = os.path.join(os.path.dirname(__file__), "..", "mcp_bridge.py")
-    mcp_bridge_path = os.path.abspath(mcp_bridge_path)
-    api_url = os.environ.get("ORCHESTRA_API_URL", "http://127.0.0.1:8000")
-
-    mcp_config = {
-        "mcpServers": {
-            "orchestra": {
-                "command": "python",
-                "args": [mcp_bridge_path],
-                "env": {
-                    "ORCHESTRA_EXECUTION_ID": execution_id,
-                    "ORCHESTRA_API_URL": api_url,
-                    "ORCHESTRA_INTERNAL_TOKEN": store.internal_api_token,
-                },
-            }
-        }
-    }
-
-    mcp_config_file = tempfile.NamedTemporaryFile(
-        mode="w", suffix=".json", prefix="mcp_config_", delete=False,
-    )
-    json.dump(mcp_config, mcp_config_file)
-    mcp_config_file.close()
-    mcp_config_path = mcp_config_file.name
+    # MCP config for the ask_user bridge, shared by every phase of the execution
+    mcp_config_path = execution.get("_mcpConfigPath")
+    if mcp_config_path is None:
+        mcp_config_path = await asyncio.to_thread(_write_mcp_config, execution_id)
+        execution["_mcpConfigPath"] = mcp_config_path
 
     cmd = [
         claude_path,
@@ -559,16 +727,14 @@ async def _try_real_orchestrator(
         "--mcp-config", mcp_config_path,
     ]
 
-    # Unset CLAUDECODE to avoid nested session detection
-    env = {**os.environ, "CLAUDECODE": ""}
+    env = cli_env()
 
     # Docker-wrap if needed
     exec_mode = execution.get("_exec_mode", "native")
     if exec_mode == "docker-wrap":
         from backend.services.docker_runner import ensure_image, wrap_command_in_docker
         if not await ensure_image(execution_id):
-            step["output"].append("[Docker] Failed to build agent image")
-            activity["output"].append("[Docker] Failed to build agent image")
+            _record_output(execution_id, step, activity, ["[Docker] Failed to build agent image"])
             return False
         cmd, env, cwd = wrap_command_in_docker(cmd, env, cwd, mcp_config_path)
 
@@ -590,113 +756,90 @@ async def _try_real_orchestrator(
         return False
 
     assert process.stdout is not None
+    # Drain stderr alongside stdout so a chatty CLI cannot block on a full pipe
+    stderr_task = asyncio.create_task(_drain_stderr(process.stderr))
+    # O(1) dedupe for filesModified; kept local since the activity is served as JSON
+    files_modified_seen = set(activity["filesModified"])
+    add_file_modified = activity["filesModified"].append
+    # Hot-loop callables bound once rather than looked up per stdout line
+    loads = orjson.loads
 
     try:
-        while True:
-            line_bytes = await process.stdout.readline()
-            if not line_bytes:
-                break
-            line = line_bytes.decode("utf-8", errors="replace").rstrip("\n")
-            if not line:
-                continue
-
-            # Try to parse as JSON
-            try:
-                msg = json.loads(line)
-            except json.JSONDecodeError:
-                # Not JSON, treat as raw output
-                step["output"].append(line)
-                activity["output"].append(line)
-                await broadcast_both(execution_id, {
-                    "type": "output",
-                    "line": line,
-                    "phase": phase,
-                })
-                continue
-
-            msg_type = msg.get("type", "")
-
-            # Extract text from assistant messages
-            if msg_type == "assistant":
-                message_data = msg.get("message", {})
-                content_blocks = message_data.get("content", [])
-                for block in content_blocks:
-                    if block.get("type") == "text":
-                        text = block.get("text", "").strip()
-                        if text:
-                            # Split long text into lines for streaming
-                            for text_line in text.split("\n"):
-                                if text_line.strip():
-                                    step["output"].append(text_line)
-                                    activity["output"].append(text_line)
-                                    await broadcast_both(execution_id, {
-                                        "type": "output",
-                                        "line": text_line,
-                                        "phase": phase,
-                                    })
-                    elif block.get("type") == "tool_use":
-                        tool_name = block.get("name", "unknown")
-                        tool_input = block.get("input", {})
-                        # Show tool usage as output
-                        tool_line = f"[{tool_name}]"
-                        if tool_name == "Bash" and "command" in tool_input:
-                            tool_line = f"$ {tool_input['command']}"
-                        elif tool_name == "Read" and "file_path" in tool_input:
-                            tool_line = f"[Read] {tool_input['file_path']}"
-                        elif tool_name in ("Edit", "Write") and "file_path" in tool_input:
-                            tool_line = f"[{tool_name}] {tool_input['file_path']}"
-                        elif tool_name == "Grep" and "pattern" in tool_input:
-                            tool_line = f"[Grep] {tool_input['pattern']}"
-                        elif tool_name == "Glob" and "pattern" in tool_input:
-                            tool_line = f"[Glob] {tool_input['pattern']}"
-                        elif tool_name == "mcp__orchestra__ask_user":
-                            q = tool_input.get("question", "")
-                            tool_line = f"[Asking user] {q}"
-
-                        step["output"].append(tool_line)
-                        activity["output"].append(tool_line)
-
-                        # Track file modifications
-                        if tool_name in ("Edit", "Write") and "file_path" in tool_input:
-                            fp = tool_input["file_path"]
-                            if fp not in activity["filesModified"]:
-                                activity["filesModified"].append(fp)
-
-                        await broadcast_both(execution_id, {
-                            "type": "output",
-                            "line": tool_line,
-                            "phase": phase,
-                        })
-
-            # Extract final result
-            elif msg_type == "result":
-                result_text = msg.get("result", "")
-                if result_text:
-                    for text_line in result_text.strip().split("\n"):
-                        if text_line.strip():
-                            step["output"].append(text_line)
-                            activity["output"].append(text_line)
-
-                            # Check for findings
-                            finding = parse_finding(text_line, execution_id)
+        async for batch in _read_line_batches(process.stdout):
+            for raw in batch:
+                if not raw:
+                    continue
+
+                # Parse stream-json frames straight from bytes; anything else is raw output
+                msg = None
+                if raw.startswith(b"{"):
+                    try:
+                        msg = loads(raw)
+                    except orjson.JSONDecodeError:
+                        pass
+                if msg is None:
+                    line = raw.decode("utf-8", errors="replace")
+                    _record_output(execution_id, step, activity, [line])
+                    await queue_output(execution_id, line, phase)
+                    continue
+
+                msg_type = msg.get("type", "")
+
+                # Extract text from assistant messages
+                if msg_type == "assistant":
+                    message_data = msg.get("message", {})
+                    content_blocks = message_data.get("content", [])
+                    for block in content_blocks:
+                        if block.get("type") == "text":
+                            text = block.get("text", "").strip()
+                            if text:
+                                # Split long text into lines for streaming
+                                text_lines = [t for t in text.splitlines() if t.strip()]
+                                _record_output(execution_id, step, activity, text_lines)
+                                await queue_output_many(execution_id, text_lines, phase)
+                        elif block.get("type") == "tool_use":
+                            tool_name = block.get("name", "unknown")
+                            tool_input = block.get("input", {})
+                            # Show tool usage as output
+                            tool_line = _format_tool_line(tool_name, tool_input)
+                            _record_output(execution_id, step, activity, [tool_line])
+
+                            # Track file modifications
+                            if tool_name in ("Edit", "Write") and "file_path" in tool_input:
+                                fp = tool_input["file_path"]
+                                if fp not in files_modified_seen:
+                                    files_modified_seen.add(fp)
+                                    add_file_modified(fp)
+
+                            await queue_output(execution_id, tool_line, phase)
+
+                # Extract final result
+                elif msg_type == "result":
+                    result_text = msg.get("result", "")
+                    if result_text:
+                        text_lines = [t for t in result_text.strip().splitlines() if t.strip()]
+                        _record_output(execution_id, step, activity, text_lines)
+                        # Check for findings across the whole block in one pass
+                        line_findings = dict(iter_findings(text_lines, execution_id))
+                        store_findings = store.findings
+                        add_finding_id = execution["findings"].append
+                        for i, text_line in enumerate(text_lines):
+                            finding = line_findings.get(i)
                             if finding:
-                                store.findings[finding["id"]] = finding
-                                execution["findings"].append(finding["id"])
+                                store_findings[finding["id"]] = finding
+                                add_finding_id(finding["id"])
                                 await broadcast_both(execution_id, {
                                     "type": "finding",
                                     "finding": finding,
                                 })
 
-                            await broadcast_both(execution_id, {
-                                "type": "output",
-                                "line": text_line,
-                                "phase": phase,
-                            })
+                            await queue_output(execution_id, text_line, phase)
 
     except asyncio.CancelledError:
         # Kill subprocess if our coroutine is cancelled (e.g., parallel peer failed)
         process.kill()
         await process.wait()
+        stderr_task.cancel()
         raise
     except Exception as exc:
         print(f"[ORCH] Error reading Claude CLI output: {exc}", flush=True)
@@ -708,14 +851,9 @@ async def _try_real_orchestrator(
 
     if process.returncode is None:
         await process.wait()
+    stderr_bytes = await stderr_task
     print(f"[ORCH] Claude CLI exited with code {process.returncode}", flush=True)
 
-    # Clean up temp MCP config
-    try:
-        os.unlink(mcp_config_path)
-    except OSError:
-        pass
-
     # Clean up rewritten Docker MCP config if docker-wrap was used
     exec_mode = execution.get("_exec_mode", "native")
     if exec_mode == "docker-wrap":
@@ -725,23 +863,142 @@ async def _try_real_orchestrator(
     # If the process failed with a non-zero exit code, still return True
     # (we tried, it ran, it just had errors — don't fall back to simulation)
     if process.returncode != 0:
-        stderr_bytes = await process.stderr.read() if process.stderr else b""
         stderr_text = stderr_bytes.decode("utf-8", errors="replace").strip()
         print(f"[ORCH] Phase {phase} stderr: {stderr_text[:1000] if stderr_text else '(empty)'}",
               flush=True)
         if stderr_text:
             err_line = f"Error: {stderr_text[:500]}"
-            step["output"].append(err_line)
-            activity["output"].append(err_line)
-            await broadcast_both(execution_id, {
-                "type": "output",
-                "line": err_line,
-                "phase": phase,
-            })
+            _record_output(execution_id, step, activity, [err_line])
+            await queue_output(execution_id, err_line, phase)
 
     return True
 
 
+def _record_output(
+    execution_id: str,
+    step: dict[str, Any],
+    activity: dict[str, Any],
+    lines: list[str],
+) -> None:
+    """Append *lines* to a phase's step and activity output.
+
+    Each list keeps at most ``_PHASE_OUTPUT_CAP`` lines; once it is
+    ``_PHASE_OUTPUT_SLACK`` past the cap the oldest lines are dropped in one
+    slice, and the step's share is appended to the execution's output log.
+    """
+    step_out = step["output"]
+    step_out.extend(lines)
+    if len(step_out) > _PHASE_OUTPUT_CAP + _PHASE_OUTPUT_SLACK:
+        overflow = len(step_out) - _PHASE_OUTPUT_CAP
+        _spill_output(execution_id, step["phase"], step_out[:overflow])
+        del step_out[:overflow]
+    activity_out = activity["output"]
+    activity_out.extend(lines)
+    if len(activity_out) > _PHASE_OUTPUT_CAP + _PHASE_OUTPUT_SLACK:
+        del activity_out[: len(activity_out) - _PHASE_OUTPUT_CAP]
+
+
+def _spill_output(execution_id: str, phase: str, lines: list[str]) -> None:
+    """Append output lines trimmed from memory to the execution's log file."""
+    try:
+        OUTPUT_LOG_DIR.mkdir(exist_ok=True)
+        with open(OUTPUT_LOG_DIR / f"{execution_id}.log", "a", encoding="utf-8") as log:
+            log.writelines(f"[{phase}] {line}\n" for line in lines)
+    except OSError as exc:
+        print(f"[ORCH] Could not spill output for {execution_id}: {exc}", flush=True)
+
+
+# Output line shown per tool call: tool name → (input field, line prefix, field required)
+_TOOL_LINE_FORMATS: dict[str, tuple[str, str, bool]] = {
+    "Bash": ("command", "$ ", True),
+    "Read": ("file_path", "[Read] ", True),
+    "Edit": ("file_path", "[Edit] ", True),
+    "Write": ("file_path", "[Write] ", True),
+    "Grep": ("pattern", "[Grep] ", True),
+    "Glob": ("pattern", "[Glob] ", True),
+    "mcp__orchestra__ask_user": ("question", "[Asking user] ", False),
+}
+
+
+def _format_tool_line(tool_name: str, tool_input: dict[str, Any]) -> str:
+    """Render a tool_use block as a single output line.
+
+    A missing required field falls back to ``[tool_name]``; an optional one
+    renders as empty after the prefix.
+    """
+    fmt = _TOOL_LINE_FORMATS.get(tool_name)
+    if fmt is not None:
+        field, prefix, required = fmt
+        if field in tool_input:
+            return f"{prefix}{tool_input[field]}"
+        if not required:
+            return prefix
+    return f"[{tool_name}]"
+
+
+# ask_user bridge script handed to each phase's CLI through its MCP config
+_MCP_BRIDGE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "mcp_bridge.py"))
+
+
+def _write_mcp_config(execution_id: str) -> str:
+    """Write the execution's MCP config to a fresh temp file and return its path (blocking)."""
+    mcp_config = {
+        "mcpServers": {
+            "orchestra": {
+                "command": sys.executable,
+                "args": [_MCP_BRIDGE_PATH],
+                "env": {
+                    "ORCHESTRA_EXECUTION_ID": execution_id,
+                    "ORCHESTRA_API_URL": os.environ.get("ORCHESTRA_API_URL", "http://127.0.0.1:8000"),
+                    "ORCHESTRA_INTERNAL_TOKEN": store.internal_api_token,
+                },
+            }
+        }
+    }
+    fd, path = tempfile.mkstemp(suffix=".json", prefix="mcp_config_")
+    try:
+        os.write(fd, orjson.dumps(mcp_config))
+    finally:
+        os.close(fd)
+    return path
+
+
+# Leading stderr bytes kept from a failed CLI run; only the head is ever logged
+_STDERR_KEEP_BYTES = 4096
+
+
+async def _drain_stderr(stream: asyncio.StreamReader | None) -> bytes:
+    """Read *stream* to EOF, keeping only the first ``_STDERR_KEEP_BYTES``."""
+    if stream is None:
+        return b""
+    kept = bytearray()
+    while chunk := await stream.read(65536):
+        if len(kept) < _STDERR_KEEP_BYTES:
+            kept += chunk[:_STDERR_KEEP_BYTES - len(kept)]
+    return bytes(kept)
+
+
+# Size of each raw read from the CLI's stdout pipe
+_STDOUT_READ_SIZE = 65536
+
+
+async def _read_line_batches(stream: asyncio.StreamReader) -> AsyncIterator[list[bytes]]:
+    """Yield the complete lines (without newlines) from each chunk read off *stream*."""
+    buf = bytearray()
+    while chunk := await stream.read(_STDOUT_READ_SIZE):
+        # Only the new chunk is searched, so a very long line is never rescanned
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            buf += chunk
+            continue
+        buf += chunk[:end]
+        lines = buf.split(b"\n")
+        buf = bytearray(chunk[end + 1:])
+        yield lines
+    if buf:
+        yield [bytes(buf)]
+
+
 async def _simulate_phase(
     execution_id: str,
     phase: str,
@@ -751,29 +1008,29 @@ async def _simulate_phase(
     """Simulate phase execution when the orchestrator is not available."""
     lines = SIMULATION_LINES.get(phase, ["Phase completed."])
     execution = store.executions.get(execution_id)
+    # The script is known up front, so scan it for findings in one pass
+    findings = dict(iter_findings(lines, execution_id)) if execution else {}
+    store_findings = store.findings
+    add_finding_id = execution["findings"].append if execution else None
 
-    for line in lines:
-        await asyncio.sleep(0.5)
+    delay = settings.SIMULATION_DELAY
+    for i, line in enumerate(lines):
+        if delay:
+            await asyncio.sleep(delay)
 
-        step["output"].append(line)
-        activity["output"].append(line)
+        _record_output(execution_id, step, activity, [line])
 
         # Check for findings even in simulation
-        if execution:
-            finding = parse_finding(line, execution_id)
-            if finding:
-                store.findings[finding["id"]] = finding
-                execution["findings"].append(finding["id"])
-                await broadcast_both(execution_id, {
-                    "type": "finding",
-                    "finding": finding,
-                })
+        finding = findings.get(i)
+        if finding:
+            store_findings[finding["id"]] = finding
+            add_finding_id(finding["id"])
+            await broadcast_both(execution_id, {
+                "type": "finding",
+                "finding": finding,
+            })
 
-        await broadcast_both(execution_id, {
-            "type": "output",
-            "line": line,
-            "phase": phase,
-        })
+        await queue_output(execution_id, line, phase)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
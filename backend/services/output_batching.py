@@ -0,0 +1,139 @@
+"""Output batching — coalesces per-line orchestrator output into ``output-batch`` frames."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import secrets
+
+import orjson
+
+from backend import store
+
+logger = logging.getLogger(__name__)
+
+# Output lines are coalesced into one frame per window or per batch of lines
+OUTPUT_BATCH_WINDOW = 0.02
+OUTPUT_BATCH_MAX = 32
+
+_output_batchers: dict[str, OutputBatcher] = {}
+
+# Fixed head of every serialized output-batch frame
+_BATCH_PREFIX = b'{"type":"output-batch","phase":'
+
+
+class OutputBatcher:
+    """Coalesces an execution's output lines into ``output-batch`` frames.
+
+    Lines are held for up to ``OUTPUT_BATCH_WINDOW`` seconds or
+    ``OUTPUT_BATCH_MAX`` lines, whichever comes first.
+    """
+
+    def __init__(self, execution_id: str) -> None:
+        self.execution_id = execution_id
+        self._lines: list[str] = []
+        self._phase = ""
+        self._timer: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    async def push(self, text: str, phase: str) -> None:
+        await self.push_many([text], phase)
+
+    async def push_many(self, lines: list[str], phase: str) -> None:
+        if self._lines and phase != self._phase:
+            await self.flush()
+        self._phase = phase
+        self._lines.extend(lines)
+        if len(self._lines) >= OUTPUT_BATCH_MAX:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                OUTPUT_BATCH_WINDOW, self._on_timer,
+            )
+
+    def cancel(self) -> None:
+        """Drop buffered lines without sending them."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._lines = []
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:
+            if not self._lines:
+                return
+            lines, self._lines = self._lines, []
+            await _broadcast_output_batch(self.execution_id, lines, self._phase)
+
+
+async def queue_output(execution_id: str, text: str, phase: str) -> None:
+    """Queue an output line for the execution's next output-batch frame."""
+    batcher = _output_batchers.get(execution_id)
+    if batcher is None:
+        batcher = _output_batchers[execution_id] = OutputBatcher(execution_id)
+    await batcher.push(text, phase)
+
+
+async def queue_output_many(execution_id: str, lines: list[str], phase: str) -> None:
+    """Queue several output lines at once for the execution's next output-batch frame."""
+    if not lines:
+        return
+    batcher = _output_batchers.get(execution_id)
+    if batcher is None:
+        batcher = _output_batchers[execution_id] = OutputBatcher(execution_id)
+    await batcher.push_many(lines, phase)
+
+
+async def flush_output(execution_id: str) -> None:
+    """Send any buffered output for an execution and drop its batcher."""
+    batcher = _output_batchers.pop(execution_id, None)
+    if batcher is not None:
+        await batcher.flush()
+
+
+@store.on_execution_released
+def discard_output(execution_id: str) -> None:
+    """Drop an execution's batcher and any output it has not sent yet."""
+    batcher = _output_batchers.pop(execution_id, None)
+    if batcher is not None:
+        batcher.cancel()
+
+
+async def _broadcast_output_batch(execution_id: str, lines: list[str], phase: str) -> None:
+    """Broadcast a batch of output lines to execution and linked console WebSockets."""
+    msg = {"type": "output-batch", "lines": lines, "phase": phase}
+    # Linked conversations get the same frame; the console expands it into console-text
+    console_msg = {**msg, "messageId": f"out-{secrets.token_hex(4)}"}
+    payload = console_payload = None
+    if store.has_subscribers(execution_id):
+        # Both frames share one encoding of the lines, spliced into a fixed template
+        body = orjson.dumps(phase) + b',"lines":' + orjson.dumps(lines)
+        payload = (_BATCH_PREFIX + body + b"}").decode()
+        console_payload = (
+            _BATCH_PREFIX + body + b',"messageId":' + orjson.dumps(console_msg["messageId"]) + b"}"
+        ).decode()
+    results = await asyncio.gather(
+        store.broadcast_raw(execution_id, msg, payload),
+        *(
+            store.broadcast_console_raw(conv_id, console_msg, console_payload)
+            for conv_id in store.conversations_for_execution(execution_id)
+        ),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(
+                "output batch broadcast failed: exec=%s", execution_id, exc_info=result,
+            )
+    logger.debug(
+        "output batch: exec=%s → %d line(s) to %d exec WS client(s)",
+        execution_id, len(lines), len(store.websocket_connections.get(execution_id, ())),
+    )
@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+import bisect
+import itertools
 import re
-import uuid
-from datetime import datetime, timezone
+import secrets
+from collections.abc import Iterator, Sequence
 from typing import Any
 
+from backend.services.timestamps import now_iso
+
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Finding detection
@@ -22,6 +26,34 @@ _FINDING_PATTERNS: list[tuple[re.Pattern[str], str, str]] = [
     (re.compile(r"WARNING:\s*(.+)", re.IGNORECASE), "low", "quality"),
 ]
 
+# One alternation of every pattern's anchor, used to reject non-finding lines in
+# a single search before the ordered per-pattern checks run
+_FINDING_PREFILTER = re.compile(
+    r"CRITICAL:|VULNERABILITY:|FINDING:|SECRET\s+(?:FOUND|DETECTED):|CVE-\d{4}-\d+|WARNING:",
+    re.IGNORECASE,
+)
+
+
+# Every pattern as one named lookahead branch, tried in list order from the
+# start of the line, so the first pattern that matches anywhere still wins
+_FINDING_RE = re.compile(
+    "|".join(
+        f"(?=(?s:.*?)(?P<f{i}>{pattern.pattern}))"
+        for i, (pattern, _severity, _type) in enumerate(_FINDING_PATTERNS)
+    ),
+    re.IGNORECASE,
+)
+
+# Branch name → (severity, type, title group number or None)
+_FINDING_BRANCHES: dict[str, tuple[str, str, int | None]] = {
+    f"f{i}": (
+        severity,
+        finding_type,
+        _FINDING_RE.groupindex[f"f{i}"] + 1 if pattern.groups else None,
+    )
+    for i, (pattern, severity, finding_type) in enumerate(_FINDING_PATTERNS)
+}
+
 
 def parse_finding(line: str, execution_id: str) -> dict[str, Any] | None:
     """
@@ -30,25 +62,54 @@ def parse_finding(line: str, execution_id: str) -> dict[str, Any] | None:
     Returns a finding dict ready for insertion into the store, or None if
     the line does not match any known finding pattern.
     """
-    for pattern, severity, finding_type in _FINDING_PATTERNS:
-        match = pattern.search(line)
-        if match:
-            title = match.group(1) if match.lastindex else line.strip()
-            return {
-                "id": f"find-{uuid.uuid4().hex[:8]}",
-                "executionId": execution_id,
-                "type": finding_type,
-                "severity": severity,
-                "status": "open",
-                "title": title.strip(),
-                "description": line.strip(),
-                "file": "",
-                "line": None,
-                "remediation": "",
-                "agent": "devsecops",
-                "createdAt": datetime.now(timezone.utc).isoformat(),
-            }
-    return None
+    if not _FINDING_PREFILTER.search(line):
+        return None
+    return _parse_prefiltered_finding(line, execution_id)
+
+
+def _parse_prefiltered_finding(line: str, execution_id: str) -> dict[str, Any] | None:
+    """Like :func:`parse_finding`, for a *line* the prefilter has already hit."""
+    match = _FINDING_RE.match(line)
+    if match is None:
+        return None
+    severity, finding_type, title_group = _FINDING_BRANCHES[match.lastgroup]
+    title = match.group(title_group) if title_group else line.strip()
+    return {
+        "id": f"find-{secrets.token_hex(4)}",
+        "executionId": execution_id,
+        "type": finding_type,
+        "severity": severity,
+        "status": "open",
+        "title": title.strip(),
+        "description": line.strip(),
+        "file": "",
+        "line": None,
+        "remediation": "",
+        "agent": "devsecops",
+        "createdAt": now_iso(),
+    }
+
+
+def iter_findings(
+    lines: Sequence[str], execution_id: str,
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Yield ``(index, finding)`` for every line in *lines* that holds a finding.
+
+    The prefilter runs once over the joined text; only the lines it hits are
+    matched, without being prefiltered again.
+    """
+    text = "\n".join(lines)
+    starts = list(itertools.accumulate((len(line) + 1 for line in lines), initial=0))
+    last = -1
+    for match in _FINDING_PREFILTER.finditer(text):
+        index = bisect.bisect_right(starts, match.start()) - 1
+        if index == last:
+            continue
+        last = index
+        finding = _parse_prefiltered_finding(lines[index], execution_id)
+        if finding:
+            yield index, finding
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -63,6 +124,16 @@ _PHASE_MARKERS: dict[str, list[str]] = {
     "report": ["report complete", "summary complete"],
 }
 
+# One lookahead branch per phase, tried in _PHASE_MARKERS order from the start
+# of the line, so the first phase with a marker anywhere in it still wins
+_PHASE_MARKER_RE = re.compile(
+    "|".join(
+        f"(?=(?s:.*?)(?P<{phase}>{'|'.join(map(re.escape, markers))}))"
+        for phase, markers in _PHASE_MARKERS.items()
+    ),
+    re.IGNORECASE,
+)
+
 
 def parse_phase_status(line: str) -> str | None:
     """
@@ -70,12 +141,8 @@ def parse_phase_status(line: str) -> str | None:
 
     Returns the phase name if detected, otherwise None.
     """
-    lower = line.lower().strip()
-    for phase, markers in _PHASE_MARKERS.items():
-        for marker in markers:
-            if marker in lower:
-                return phase
-    return None
+    match = _PHASE_MARKER_RE.match(line)
+    return match.lastgroup if match else None
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -133,6 +200,9 @@ _FILE_MOD_PATTERN = re.compile(
     re.IGNORECASE,
 )
 
+# The verbs alone, used to find candidate lines in one scan of the joined output
+_FILE_MOD_PREFILTER = re.compile(r"created|modified|wrote|edited|updated|deleted", re.IGNORECASE)
+
 
 def detect_agent_activity(lines: list[str]) -> dict[str, Any] | None:
     """
@@ -144,9 +214,17 @@ def detect_agent_activity(lines: list[str]) -> dict[str, Any] | None:
     if not lines:
         return None
 
+    # Scan the joined output once; only lines holding a verb get the full pattern
+    text = "\n".join(lines)
+    starts = list(itertools.accumulate((len(line) + 1 for line in lines), initial=0))
     files_modified: list[str] = []
-    for line in lines:
-        match = _FILE_MOD_PATTERN.search(line)
+    last = -1
+    for hit in _FILE_MOD_PREFILTER.finditer(text):
+        index = bisect.bisect_right(starts, hit.start()) - 1
+        if index == last:
+            continue
+        last = index
+        match = _FILE_MOD_PATTERN.search(lines[index])
         if match:
             files_modified.append(match.group(1))
 
@@ -155,10 +233,10 @@ def detect_agent_activity(lines: list[str]) -> dict[str, Any] | None:
         return None
 
     return {
-        "id": f"act-{uuid.uuid4().hex[:8]}",
+        "id": f"act-{secrets.token_hex(4)}",
         "output": lines,
         "filesModified": files_modified,
-        "startedAt": datetime.now(timezone.utc).isoformat(),
+        "startedAt": now_iso(),
         "completedAt": None,
         "status": "running",
     }
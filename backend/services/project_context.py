@@ -2,10 +2,18 @@
 
 from __future__ import annotations
 
-import json
 import os
 
-_cache: dict[str, str] = {}
+import orjson
+
+# (work_dir, file signature) → context block; oldest entries evicted first
+_cache: dict[tuple[str, tuple[int, ...]], str] = {}
+_CACHE_MAX = 32
+
+_CONTEXT_FILES = ("CLAUDE.md", "README.md", "package.json", "pyproject.toml")
+
+# Dependency names listed per package.json section; keeps huge manifests out of prompts
+_MAX_LISTED_DEPS = 200
 
 
 def build_project_context(work_dir: str) -> str:
@@ -14,8 +22,10 @@ def build_project_context(work_dir: str) -> str:
     Reads CLAUDE.md, README.md, package.json, and pyproject.toml (with graceful
     failure) and returns a formatted ## Project Context block, or empty string.
     """
-    if work_dir in _cache:
-        return _cache[work_dir]
+    key = (work_dir, _signature(work_dir))
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
 
     sections: list[str] = []
 
@@ -44,10 +54,23 @@ def build_project_context(work_dir: str) -> str:
     else:
         result = "## Project Context\n\n" + "\n\n".join(sections)
 
-    _cache[work_dir] = result
+    if len(_cache) >= _CACHE_MAX:
+        del _cache[next(iter(_cache))]
+    _cache[key] = result
     return result
 
 
+def _signature(work_dir: str) -> tuple[int, ...]:
+    """Return the mtimes of the context files, so edits invalidate the cache."""
+    sig: list[int] = []
+    for name in _CONTEXT_FILES:
+        try:
+            sig.append(os.stat(os.path.join(work_dir, name)).st_mtime_ns)
+        except OSError:
+            sig.append(0)
+    return tuple(sig)
+
+
 def _read_file(path: str, max_chars: int) -> str:
     """Read a file up to max_chars, returning empty string on failure."""
     try:
@@ -60,19 +83,19 @@ def _read_file(path: str, max_chars: int) -> str:
 def _read_package_json(path: str) -> str:
     """Extract scripts and key dependency names from package.json."""
     try:
-        with open(path, encoding="utf-8") as f:
-            data = json.load(f)
-    except (OSError, json.JSONDecodeError, UnicodeDecodeError):
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
         return ""
 
     parts: list[str] = []
     scripts = data.get("scripts")
     if scripts:
-        parts.append("**Scripts:** " + ", ".join(f"`{k}`: {v}" for k, v in scripts.items()))
+        parts.append("**Scripts:** " + ", ".join([f"`{k}`: {v}" for k, v in scripts.items()]))
 
     for dep_key in ("dependencies", "devDependencies"):
         deps = data.get(dep_key)
         if deps:
-            parts.append(f"**{dep_key}:** " + ", ".join(sorted(deps.keys())))
+            parts.append(f"**{dep_key}:** " + ", ".join(sorted(deps)[:_MAX_LISTED_DEPS]))
 
     return "\n".join(parts) if parts else ""
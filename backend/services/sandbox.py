@@ -4,12 +4,20 @@ from __future__ import annotations
 
 import functools
 import os
+import re
+import shutil
 import subprocess
+from collections.abc import Callable
 from dataclasses import dataclass
 from pathlib import Path
 
 
-@dataclass(frozen=True)
+# Container runtimes that show up in PID 1's cgroup paths
+_CGROUP_PATH = "/proc/1/cgroup"
+_CGROUP_MARKER = re.compile(rb"docker|kubepods|containerd")
+
+
+@dataclass(frozen=True, slots=True)
 class SandboxStatus:
     """Result of sandbox/container detection."""
     sandboxed: bool
@@ -19,17 +27,23 @@ class SandboxStatus:
     execution_mode: str
 
 
+@functools.lru_cache(maxsize=1)
 def _check_docker_available() -> bool:
     """Check whether Docker is available by running `docker info`.
 
-    Returns True if `docker info` exits successfully within 5 seconds.
+    Returns False straight away when no `docker` binary is on PATH, otherwise
+    True if `docker info` exits successfully within 2 seconds. Cached for the
+    life of the process; call ``_check_docker_available.cache_clear()`` to
+    probe again.
     """
+    if shutil.which("docker") is None:
+        return False
     try:
         result = subprocess.run(
             ["docker", "info"],
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
-            timeout=5,
+            timeout=2,
         )
         return result.returncode == 0
     except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
@@ -67,69 +81,54 @@ def detect_sandbox() -> SandboxStatus:
     Also checks Docker availability for bare-metal auto-containerization.
     """
     override = os.environ.get("ORCHESTRA_ALLOW_HOST", "").lower() == "true"
+    container_type = _detect_container_type()
+    sandboxed = container_type is not None
+    # Probed once, whichever branch matched
+    docker = _check_docker_available()
+    return SandboxStatus(
+        sandboxed=sandboxed, container_type=container_type,
+        override_active=override, docker_available=docker,
+        execution_mode=_compute_execution_mode(sandboxed, override, docker),
+    )
 
-    # 1. VS Code devcontainer
-    if os.environ.get("DEVCONTAINER"):
-        docker = _check_docker_available()
-        mode = _compute_execution_mode(True, override, docker)
-        return SandboxStatus(
-            sandboxed=True, container_type="devcontainer",
-            override_active=override, docker_available=docker,
-            execution_mode=mode,
-        )
 
-    # 2. Explicit container marker
-    if os.environ.get("ORCHESTRA_CONTAINER"):
-        docker = _check_docker_available()
-        mode = _compute_execution_mode(True, override, docker)
-        return SandboxStatus(
-            sandboxed=True, container_type="orchestra-container",
-            override_active=override, docker_available=docker,
-            execution_mode=mode,
-        )
+def _detect_container_type() -> str | None:
+    """Return the kind of container the process runs in, or None on bare metal."""
+    for container_type, check in _CONTAINER_CHECKS:
+        if check():
+            return container_type
+    return None
 
-    # 3. Docker marker file
-    if Path("/.dockerenv").exists():
-        docker = _check_docker_available()
-        mode = _compute_execution_mode(True, override, docker)
-        return SandboxStatus(
-            sandboxed=True, container_type="docker",
-            override_active=override, docker_available=docker,
-            execution_mode=mode,
-        )
 
-    # 4. cgroup-based detection
+@functools.lru_cache(maxsize=1)
+def _dockerenv_exists() -> bool:
+    """Return True if Docker's /.dockerenv marker exists (probed once per process)."""
+    return Path("/.dockerenv").exists()
+
+
+@functools.lru_cache(maxsize=1)
+def _read_init_cgroup() -> bytes:
+    """Return PID 1's raw cgroup listing, or b"" if unreadable (read once per process)."""
     try:
-        cgroup = Path("/proc/1/cgroup").read_text()
-        if "docker" in cgroup or "kubepods" in cgroup or "containerd" in cgroup:
-            docker = _check_docker_available()
-            mode = _compute_execution_mode(True, override, docker)
-            return SandboxStatus(
-                sandboxed=True, container_type="cgroup-container",
-                override_active=override, docker_available=docker,
-                execution_mode=mode,
-            )
+        with open(_CGROUP_PATH, "rb") as f:
+            return f.read()
     except (FileNotFoundError, PermissionError):
-        pass
-
-    # 5. Binding to 0.0.0.0 suggests container
-    if os.environ.get("BACKEND_HOST") == "0.0.0.0":
-        docker = _check_docker_available()
-        mode = _compute_execution_mode(True, override, docker)
-        return SandboxStatus(
-            sandboxed=True, container_type="network-inferred",
-            override_active=override, docker_available=docker,
-            execution_mode=mode,
-        )
-
-    # Not sandboxed — check Docker for auto-containerization
-    docker = _check_docker_available()
-    mode = _compute_execution_mode(False, override, docker)
-    return SandboxStatus(
-        sandboxed=False, container_type=None,
-        override_active=override, docker_available=docker,
-        execution_mode=mode,
-    )
+        return b""
+
+
+# Container checks in priority order: (container_type, probe)
+_CONTAINER_CHECKS: tuple[tuple[str, Callable[[], bool]], ...] = (
+    # VS Code devcontainer
+    ("devcontainer", lambda: bool(os.environ.get("DEVCONTAINER"))),
+    # Explicit container marker
+    ("orchestra-container", lambda: bool(os.environ.get("ORCHESTRA_CONTAINER"))),
+    # Docker marker file
+    ("docker", _dockerenv_exists),
+    # cgroup-based detection
+    ("cgroup-container", lambda: _CGROUP_MARKER.search(_read_init_cgroup()) is not None),
+    # Binding to 0.0.0.0 suggests container
+    ("network-inferred", lambda: os.environ.get("BACKEND_HOST") == "0.0.0.0"),
+)
 
 
 @functools.lru_cache(maxsize=1)
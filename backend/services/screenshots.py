@@ -2,11 +2,22 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import asyncio
 from pathlib import Path
 from typing import Any
 
 from backend import store
+from backend.services.timestamps import now_iso
+
+try:
+    from playwright.async_api import async_playwright as _async_playwright
+except ImportError:  # Playwright is optional; browser screenshots are skipped without it
+    _async_playwright = None
+
+# One Chromium instance, launched on first use and shared by every capture
+_playwright: Any = None
+_browser: Any = None
+_browser_lock = asyncio.Lock()
 
 
 async def capture_terminal_snapshot(
@@ -17,7 +28,8 @@ async def capture_terminal_snapshot(
 ) -> dict[str, Any]:
     """Capture a terminal snapshot (last 20 lines of output)."""
     screenshot_id = store.next_screenshot_id()
-    lines = output_lines[-20:] if len(output_lines) > 20 else list(output_lines)
+    # A slice is already a copy, and is safe on lists shorter than 20
+    lines = output_lines[-20:]
 
     screenshot: dict[str, Any] = {
         "id": screenshot_id,
@@ -25,7 +37,7 @@ async def capture_terminal_snapshot(
         "type": "terminal",
         "phase": phase,
         "milestone": milestone or f"{phase} phase complete",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": now_iso(),
         "terminalLines": lines,
     }
     store.screenshots[screenshot_id] = screenshot
@@ -38,9 +50,7 @@ async def capture_browser_screenshot(
     milestone: str = "",
 ) -> dict[str, Any] | None:
     """Attempt to capture a browser screenshot using Playwright (optional)."""
-    try:
-        from playwright.async_api import async_playwright
-    except ImportError:
+    if _async_playwright is None:
         return None
 
     screenshot_id = store.next_screenshot_id()
@@ -49,12 +59,15 @@ async def capture_browser_screenshot(
     filepath = screenshots_dir / f"{screenshot_id}.png"
 
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page(viewport={"width": 1280, "height": 720})
-            await page.goto(url, wait_until="networkidle", timeout=15000)
+        browser = await _get_browser()
+        page = await browser.new_page(viewport={"width": 1280, "height": 720})
+        try:
+            # networkidle can stall on analytics/polling endpoints until the timeout
+            await page.goto(url, wait_until="domcontentloaded", timeout=10000)
+            await page.wait_for_load_state("load", timeout=5000)
             await page.screenshot(path=str(filepath))
-            await browser.close()
+        finally:
+            await page.close()
     except Exception:
         return None
 
@@ -64,8 +77,31 @@ async def capture_browser_screenshot(
         "type": "browser",
         "phase": "security",
         "milestone": milestone or "Live product screenshot",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": now_iso(),
         "imageUrl": f"/api/screenshots/{screenshot_id}/image",
     }
     store.screenshots[screenshot_id] = screenshot
     return screenshot
+
+
+async def _get_browser() -> Any:
+    """Return the shared Chromium instance, launching it if needed."""
+    global _playwright, _browser
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            if _playwright is None:
+                _playwright = await _async_playwright().start()
+            _browser = await _playwright.chromium.launch(headless=True)
+        return _browser
+
+
+async def close_browser() -> None:
+    """Shut down the shared Chromium instance, if one was launched."""
+    global _playwright, _browser
+    async with _browser_lock:
+        if _browser is not None:
+            await _browser.close()
+            _browser = None
+        if _playwright is not None:
+            await _playwright.stop()
+            _playwright = None
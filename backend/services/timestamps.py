@@ -0,0 +1,20 @@
+"""Timestamps — ISO 8601 UTC strings for store records, cached at 100 ms resolution."""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+
+_NOW_ISO_TTL = 0.1
+_now_iso_at: float = float("-inf")
+_now_iso_value: str = ""
+
+
+def now_iso() -> str:
+    """Return the current UTC time as ISO 8601, reusing the string for 100 ms."""
+    global _now_iso_at, _now_iso_value
+    tick = time.monotonic()
+    if tick - _now_iso_at > _NOW_ISO_TTL:
+        _now_iso_value = datetime.now(timezone.utc).isoformat()
+        _now_iso_at = tick
+    return _now_iso_value
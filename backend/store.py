@@ -2,11 +2,151 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import collections
+import itertools
+import logging
 import secrets
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from typing import Any
 
-from fastapi import WebSocket
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Container and record types
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+class LRUDict(collections.OrderedDict):
+    """Dict capped at *maxsize* entries that evicts the least recently used one.
+
+    Writes, ``[]`` reads and ``get()`` refresh an entry; ``peek()`` does not.
+    If given, *on_evict* is called with the key and value of each evicted
+    entry. Entries for which *keep* returns True are never evicted; while
+    only such entries are older, the dict may grow past *maxsize*.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        on_evict: Callable[[Any, Any], None] | None = None,
+        keep: Callable[[Any], bool] | None = None,
+    ) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self.keep = keep
+
+    def __getitem__(self, key: Any) -> Any:
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if key in self:
+            self.move_to_end(key)
+        super().__setitem__(key, value)
+        while len(self) > self.maxsize and self._evict_one():
+            pass
+
+    def _evict_one(self) -> bool:
+        """Evict the oldest entry *keep* allows, other than the newest; False if none."""
+        keep = self.keep
+        for evicted_key, evicted in itertools.islice(self.items(), len(self) - 1):
+            if keep is None or not keep(evicted):
+                break
+        else:
+            return False
+        super().pop(evicted_key)
+        if self.on_evict is not None:
+            self.on_evict(evicted_key, evicted)
+        return True
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        return default
+
+    def peek(self, key: Any, default: Any = None) -> Any:
+        """Return the value for *key* without refreshing it."""
+        return super().get(key, default)
+
+
+class MessageBuffer(collections.deque):
+    """Replay history for one execution or conversation, capped at ``_MESSAGE_BUFFER_CAP``.
+
+    ``version`` is bumped on every append, so :func:`replay_frame` can tell
+    when its cached serialization is stale.
+    """
+
+    def __init__(self, messages: Any = ()) -> None:
+        super().__init__(messages, _MESSAGE_BUFFER_CAP)
+        self.version = 0
+
+
+@dataclass(slots=True)
+class PendingQuestion:
+    """A question from an agent, waiting for the dashboard user's answer."""
+    id: str
+    execution_id: str
+    question: str
+    options: list[str]
+    answer: str | None = None
+    event: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+def _drop_conversation_state(conversation_id: str, conversation: dict[str, Any]) -> None:
+    """Release everything kept for a conversation evicted from ``conversations``."""
+    set_active_execution(conversation, None)
+    console_messages.pop(conversation_id, None)
+    _replay_cache.pop(conversation_id, None)
+
+
+def _execution_active(execution: dict[str, Any] | None) -> bool:
+    """Return True if *execution* is queued or running and must stay in the store."""
+    return execution is not None and execution.get("status") in _ACTIVE_STATUSES
+
+
+def _conversation_active(conversation: dict[str, Any]) -> bool:
+    """Return True if *conversation* is linked to a queued or running execution."""
+    execution_id = conversation.get("activeExecutionId")
+    return bool(execution_id) and _execution_active(executions.peek(execution_id))
+
+
+def on_execution_released(hook: Callable[[str], None]) -> Callable[[str], None]:
+    """Register *hook* to release state kept outside the store for an evicted execution.
+
+    Usable as a decorator; *hook* is called with the execution ID.
+    """
+    _execution_release_hooks.append(hook)
+    return hook
+
+
+def _drop_execution_state(execution_id: str, execution: dict[str, Any]) -> None:
+    """Release everything kept for an execution evicted from ``executions``."""
+    for finding_id in execution.get("findings", ()):
+        findings.pop(finding_id, None)
+    for question_id in pending_questions_by_execution.pop(execution_id, {}):
+        pending_questions.pop(question_id, None)
+    for conv_id in execution_to_conversations.pop(execution_id, ()):
+        conversation = conversations.peek(conv_id)
+        if conversation is not None and conversation.get("activeExecutionId") == execution_id:
+            conversation["activeExecutionId"] = None
+    websocket_connections.pop(execution_id, None)
+    execution_messages.pop(execution_id, None)
+    _replay_cache.pop(execution_id, None)
+    dynamic_agents.pop(execution_id, None)
+    file_activities.pop(execution_id, None)
+    files_modified.pop(execution_id, None)
+    for hook in _execution_release_hooks:
+        hook(execution_id)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -15,32 +155,69 @@ from fastapi import WebSocket
 
 internal_api_token: str = secrets.token_urlsafe(32)
 
-executions: dict[str, dict[str, Any]] = {}
+# Caps on long-lived records; past them the least recently used entry is evicted.
+# Queued and running executions, and conversations linked to them, are never evicted.
+_EXECUTION_CAP = settings.MAX_RETAINED_EXECUTIONS
+_CONVERSATION_CAP = 10_000
+_SCREENSHOT_CAP = 500
+_ACTIVE_STATUSES = frozenset({"queued", "running"})
+
+executions: dict[str, dict[str, Any]] = LRUDict(
+    _EXECUTION_CAP, on_evict=_drop_execution_state, keep=_execution_active,
+)
 agents: dict[str, dict[str, Any]] = {}
-findings: dict[str, dict[str, Any]] = {}
-conversations: dict[str, dict[str, Any]] = {}
-screenshots: dict[str, dict[str, Any]] = {}
+findings: dict[str, dict[str, Any]] = {}  # released with their execution
+conversations: dict[str, dict[str, Any]] = LRUDict(
+    _CONVERSATION_CAP, on_evict=_drop_conversation_state, keep=_conversation_active,
+)
+screenshots: dict[str, dict[str, Any]] = LRUDict(_SCREENSHOT_CAP)
 websocket_connections: dict[str, set[WebSocket]] = {}
 console_connections: dict[str, set[WebSocket]] = {}
-pending_questions: dict[str, dict[str, Any]] = {}
-pending_questions_by_execution: dict[str, list[str]] = {}
+pending_questions: dict[str, PendingQuestion] = {}
+pending_questions_by_execution: dict[str, dict[str, PendingQuestion]] = {}  # exec_id → question_id → question
 
 # Message history buffers — replayed to late-connecting WebSocket clients
-execution_messages: dict[str, list[dict[str, Any]]] = {}  # exec_id → [messages]
-console_messages: dict[str, list[dict[str, Any]]] = {}    # conv_id → [messages]
+# Bounded to _MESSAGE_BUFFER_CAP; appending past the cap drops the oldest in O(1)
+execution_messages: dict[str, MessageBuffer] = LRUDict(_EXECUTION_CAP)  # exec_id → [messages]
+console_messages: dict[str, MessageBuffer] = LRUDict(_CONVERSATION_CAP)    # conv_id → [messages]
 
 _MESSAGE_BUFFER_CAP = 500
 
+# Last serialized replay frame per buffer key: (buffer, version, frame)
+_REPLAY_CACHE_CAP = 64
+_replay_cache: dict[str, tuple[MessageBuffer, int, str]] = LRUDict(_REPLAY_CACHE_CAP)
+
+# Per-socket send queues; output frames past the cap are dropped for slow clients
+_OUTBOX_CAP = 512
+_DROPPABLE_TYPES = frozenset({"output", "output-batch"})
+# Frames that pile up behind a send go out together as one batch frame
+_SEND_BATCH_MAX = 64
+_BATCH_HEAD = '{"type":"batch","messages":['
+_outboxes: dict[WebSocket, _Outbox] = {}
+frames_dropped: int = 0
+
+# Release callbacks for per-execution state kept outside this module
+_execution_release_hooks: list[Callable[[str], None]] = []
+
 # Dynamic agent tracking
 dynamic_agents: dict[str, dict[str, dict[str, Any]]] = {}  # exec_id → agent_id → agent dict
-file_activities: dict[str, list[dict[str, Any]]] = {}  # exec_id → [{file, action, agent_id, agent_name, timestamp}]
+file_activities: dict[str, list[dict[str, Any]]] = {}  # exec_id → [{file, action, agentId, agentName, tsNs}]
+files_modified: dict[str, dict[str, None]] = {}  # exec_id → ordered set of paths any agent modified
 codebases: dict[str, dict[str, Any]] = {}  # codebase_id → {id, name, path, gitUrl, executionIds, createdAt}
+execution_to_conversations: dict[str, set[str]] = {}  # exec_id → {conv_id} whose activeExecutionId is exec_id
+
+# File activity fan-out — drained by run_activity_broadcaster()
+_ACTIVITY_QUEUE_CAP = 10_000
+_ACTIVITY_BATCH_MAX = 16
+_ACTIVITY_BATCH_WINDOW = 0.01
+activity_queue: asyncio.Queue[tuple[str, dict[str, Any]]] = asyncio.Queue(maxsize=_ACTIVITY_QUEUE_CAP)
+activity_dropped: int = 0
 
-_execution_counter: int = 0
-_conversation_counter: int = 0
-_screenshot_counter: int = 0
-_agent_counter: int = 0
-_codebase_counter: int = 0
+_execution_ids = itertools.count(1)
+_conversation_ids = itertools.count(1)
+_screenshot_ids = itertools.count(1)
+_agent_ids = itertools.count(1)
+_codebase_ids = itertools.count(1)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -50,37 +227,27 @@ _codebase_counter: int = 0
 
 def next_execution_id() -> str:
     """Return the next execution ID: exec-001, exec-002, etc."""
-    global _execution_counter
-    _execution_counter += 1
-    return f"exec-{_execution_counter:03d}"
+    return f"exec-{next(_execution_ids):03d}"
 
 
 def next_conversation_id() -> str:
     """Return the next conversation ID: conv-001, conv-002, etc."""
-    global _conversation_counter
-    _conversation_counter += 1
-    return f"conv-{_conversation_counter:03d}"
+    return f"conv-{next(_conversation_ids):03d}"
 
 
 def next_screenshot_id() -> str:
     """Return the next screenshot ID: ss-001, ss-002, etc."""
-    global _screenshot_counter
-    _screenshot_counter += 1
-    return f"ss-{_screenshot_counter:03d}"
+    return f"ss-{next(_screenshot_ids):03d}"
 
 
 def next_agent_id() -> str:
     """Return the next dynamic agent ID: agent-0001, agent-0002, etc."""
-    global _agent_counter
-    _agent_counter += 1
-    return f"agent-{_agent_counter:04d}"
+    return f"agent-{next(_agent_ids):04d}"
 
 
 def next_codebase_id() -> str:
     """Return the next codebase ID: codebase-001, codebase-002, etc."""
-    global _codebase_counter
-    _codebase_counter += 1
-    return f"codebase-{_codebase_counter:03d}"
+    return f"codebase-{next(_codebase_ids):03d}"
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -202,18 +369,55 @@ AGENT_DEFAULTS: list[dict[str, Any]] = [
 ]
 
 
+# Fully merged runtime records for the built-in agents, built once at import
+_AGENT_TEMPLATES: dict[str, dict[str, Any]] = {
+    defaults["role"]: {
+        **defaults,
+        "isCustom": False,
+        "status": "idle",
+        "currentExecution": None,
+        "completedTasks": 0,
+        "successRate": 100.0,
+    }
+    for defaults in AGENT_DEFAULTS
+}
+
+
 def init_agents() -> None:
     """Initialize the agent registry with default agent info."""
-    for defaults in AGENT_DEFAULTS:
-        role = defaults["role"]
-        agents[role] = {
-            **defaults,
-            "isCustom": False,
-            "status": "idle",
-            "currentExecution": None,
-            "completedTasks": 0,
-            "successRate": 100.0,
-        }
+    agents.update({role: dict(template) for role, template in _AGENT_TEMPLATES.items()})
+
+
+def set_active_execution(conversation: dict[str, Any], execution_id: str | None) -> None:
+    """Set a conversation's activeExecutionId and keep the reverse index in sync."""
+    previous = conversation.get("activeExecutionId")
+    if previous:
+        linked = execution_to_conversations.get(previous)
+        if linked is not None:
+            linked.discard(conversation["id"])
+            if not linked:
+                del execution_to_conversations[previous]
+    conversation["activeExecutionId"] = execution_id
+    if execution_id:
+        linked = execution_to_conversations.get(execution_id)
+        if linked is None:
+            linked = execution_to_conversations[execution_id] = set()
+        linked.add(conversation["id"])
+
+
+def conversations_for_execution(execution_id: str) -> tuple[str, ...]:
+    """Return the IDs of conversations whose active execution is *execution_id*."""
+    return tuple(execution_to_conversations.get(execution_id, ()))
+
+
+def agent_snapshot(agent: dict[str, Any]) -> dict[str, Any]:
+    """Return the JSON-safe view of a dynamic agent (no event or private indexes)."""
+    snapshot = {
+        k: v for k, v in agent.items()
+        if k != "result_event" and not k.startswith("_")
+    }
+    snapshot["output"] = list(agent["output"])
+    return snapshot
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -221,70 +425,219 @@ def init_agents() -> None:
 # ──────────────────────────────────────────────────────────────────────────────
 
 
+def has_subscribers(execution_id: str) -> bool:
+    """Return True if an execution or linked console WebSocket is connected."""
+    if websocket_connections.get(execution_id):
+        return True
+    return any(
+        console_connections.get(conv_id)
+        for conv_id in execution_to_conversations.get(execution_id, ())
+    )
+
+
+class _Outbox:
+    """Frames waiting to be sent to one WebSocket, drained in order by its own task.
+
+    Broadcasts only enqueue, so a slow client never holds up the orchestrator
+    or the other clients. Once ``_OUTBOX_CAP`` frames are waiting, an output
+    frame is dropped to make room: the oldest one if it is at the head of
+    the queue, otherwise the incoming one. Other events are always kept.
+    Frames queued while a send is in flight are coalesced into one
+    ``batch`` frame.
+    """
+
+    def __init__(self, ws: WebSocket, connections: set[WebSocket]) -> None:
+        self.ws = ws
+        self.connections = connections
+        self.frames: collections.deque[tuple[str, bool]] = collections.deque()
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.get_running_loop().create_task(self._drain())
+
+    def put(self, payload: str, droppable: bool) -> None:
+        global frames_dropped
+        frames = self.frames
+        if len(frames) >= _OUTBOX_CAP:
+            if frames[0][1]:
+                frames.popleft()
+                frames_dropped += 1
+            elif droppable:
+                frames_dropped += 1
+                return
+        frames.append((payload, droppable))
+        self.wakeup.set()
+
+    async def _drain(self) -> None:
+        frames = self.frames
+        try:
+            while True:
+                await self.wakeup.wait()
+                self.wakeup.clear()
+                while frames:
+                    if len(frames) == 1:
+                        payload = frames.popleft()[0]
+                    else:
+                        count = min(len(frames), _SEND_BATCH_MAX)
+                        payload = _BATCH_HEAD + ",".join(frames.popleft()[0] for _ in range(count)) + "]}"
+                    await self.ws.send_text(payload)
+        except (WebSocketDisconnect, RuntimeError, OSError):
+            pass  # Broken or closed connection: stop sending to it
+        except Exception:
+            logger.exception("WebSocket sender failed; dropping the connection")
+        finally:
+            self.connections.discard(self.ws)
+            if _outboxes.get(self.ws) is self:
+                del _outboxes[self.ws]
+
+
+def _enqueue(connections: set[WebSocket], message: dict, payload: str | None) -> None:
+    """Queue *message* (serialized once, unless *payload* is given) for every socket."""
+    if payload is None:
+        payload = orjson.dumps(message).decode()
+    droppable = message.get("type") in _DROPPABLE_TYPES
+    for ws in connections:
+        outbox = _outboxes.get(ws)
+        if outbox is None:
+            outbox = _outboxes[ws] = _Outbox(ws, connections)
+        outbox.put(payload, droppable)
+
+
+def release_websocket(ws: WebSocket) -> None:
+    """Stop the sender for a disconnected WebSocket and drop its unsent frames."""
+    outbox = _outboxes.pop(ws, None)
+    if outbox is not None:
+        outbox.task.cancel()
+
+
+def replay_frame(buffers: dict[str, MessageBuffer], key: str) -> str | None:
+    """Return *key*'s buffered history as one ``batch`` frame, or None if empty.
+
+    The frame is cached until the buffer changes, so a burst of reconnects
+    serializes the history once.
+    """
+    buf = buffers.get(key)
+    if not buf:
+        return None
+    cached = _replay_cache.get(key)
+    if cached is not None and cached[0] is buf and cached[1] == buf.version:
+        return cached[2]
+    frame = orjson.dumps({"type": "batch", "messages": list(buf)}).decode()
+    _replay_cache[key] = (buf, buf.version, frame)
+    return frame
+
+
+def register_websocket(connections: dict[str, set[WebSocket]], key: str, ws: WebSocket) -> None:
+    """Subscribe *ws* to broadcasts for *key* in *connections*."""
+    conns = connections.get(key)
+    if conns is None:
+        conns = connections[key] = set()
+    conns.add(ws)
+
+
+def unregister_websocket(connections: dict[str, set[WebSocket]], key: str, ws: WebSocket) -> None:
+    """Unsubscribe *ws* from *key*, dropping the empty set, and release its sender."""
+    conns = connections.get(key)
+    if conns is not None:
+        conns.discard(ws)
+        if not conns:
+            del connections[key]
+    release_websocket(ws)
+
+
 async def broadcast(execution_id: str, message: dict) -> None:
     """Send a JSON message to every WebSocket subscribed to *execution_id*."""
+    await broadcast_raw(execution_id, message, None)
+
+
+async def broadcast_raw(execution_id: str, message: dict, payload: str | None) -> None:
+    """Like :func:`broadcast`, but send *payload*, already serialized from *message*.
+
+    A ``None`` payload is serialized here, and only if a client is connected.
+    """
     # If this is a dismissal, remove the original clarification from the buffer
     # so reconnecting clients don't see already-answered questions.
     if message.get("type") == "clarification-dismissed":
         qid = message.get("questionId")
-        buf = execution_messages.get(execution_id, [])
-        execution_messages[execution_id] = [
+        buf = execution_messages.get(execution_id, ())
+        execution_messages[execution_id] = MessageBuffer(
             m for m in buf
             if not (m.get("type") == "clarification" and m.get("questionId") == qid)
-        ]
+        )
 
     # Buffer the message so late-connecting clients can replay history
-    if execution_id not in execution_messages:
-        execution_messages[execution_id] = []
-    buf = execution_messages[execution_id]
+    buf = execution_messages.get(execution_id)
+    if buf is None:
+        buf = execution_messages[execution_id] = MessageBuffer()
     buf.append(message)
-    if len(buf) > _MESSAGE_BUFFER_CAP:
-        del buf[: len(buf) - _MESSAGE_BUFFER_CAP]
-
-    connections = websocket_connections.get(execution_id, set())
-    dead: list[WebSocket] = []
-    payload = json.dumps(message)
+    buf.version += 1
 
-    for ws in connections:
-        try:
-            await ws.send_text(payload)
-        except Exception:
-            dead.append(ws)
-
-    # Clean up broken connections
-    for ws in dead:
-        connections.discard(ws)
+    connections = websocket_connections.get(execution_id)
+    if connections:
+        _enqueue(connections, message, payload)
 
 
 async def broadcast_console(conversation_id: str, message: dict) -> None:
     """Send a JSON message to every WebSocket subscribed to a conversation."""
+    await broadcast_console_raw(conversation_id, message, None)
+
+
+async def broadcast_console_raw(conversation_id: str, message: dict, payload: str | None) -> None:
+    """Like :func:`broadcast_console`, but send *payload*, already serialized from *message*.
+
+    A ``None`` payload is serialized here, and only if a client is connected.
+    """
     # If this is a dismissal, remove the original clarification from the buffer
     # so reconnecting clients don't see already-answered questions.
     if message.get("type") == "clarification-dismissed":
         qid = message.get("questionId")
-        buf = console_messages.get(conversation_id, [])
-        console_messages[conversation_id] = [
+        buf = console_messages.get(conversation_id, ())
+        console_messages[conversation_id] = MessageBuffer(
             m for m in buf
             if not (m.get("type") == "clarification" and m.get("questionId") == qid)
-        ]
+        )
 
     # Buffer the message so late-connecting clients can replay history
-    if conversation_id not in console_messages:
-        console_messages[conversation_id] = []
-    buf = console_messages[conversation_id]
+    buf = console_messages.get(conversation_id)
+    if buf is None:
+        buf = console_messages[conversation_id] = MessageBuffer()
     buf.append(message)
-    if len(buf) > _MESSAGE_BUFFER_CAP:
-        del buf[: len(buf) - _MESSAGE_BUFFER_CAP]
-
-    connections = console_connections.get(conversation_id, set())
-    dead: list[WebSocket] = []
-    payload = json.dumps(message)
-
-    for ws in connections:
-        try:
-            await ws.send_text(payload)
-        except Exception:
-            dead.append(ws)
-
-    for ws in dead:
-        connections.discard(ws)
+    buf.version += 1
+
+    connections = console_connections.get(conversation_id)
+    if connections:
+        _enqueue(connections, message, payload)
+
+
+async def broadcast_linked(execution_id: str, message: dict) -> None:
+    """Send *message* to an execution and every conversation linked to it.
+
+    The message is serialized once for all of them, and only if one has a
+    connected client.
+    """
+    payload = orjson.dumps(message).decode() if has_subscribers(execution_id) else None
+    await broadcast_raw(execution_id, message, payload)
+    for conv_id in conversations_for_execution(execution_id):
+        await broadcast_console_raw(conv_id, message, payload)
+
+
+def queue_activity(execution_id: str, activity: dict[str, Any]) -> None:
+    """Queue a file-activity event for broadcast, dropping it if the queue is full."""
+    global activity_dropped
+    try:
+        activity_queue.put_nowait((execution_id, activity))
+    except asyncio.QueueFull:
+        activity_dropped += 1
+
+
+async def run_activity_broadcaster() -> None:
+    """Drain activity_queue, sending one file-activity-batch per execution per window."""
+    while True:
+        batch = [await activity_queue.get()]
+        await asyncio.sleep(_ACTIVITY_BATCH_WINDOW)
+        while len(batch) < _ACTIVITY_BATCH_MAX and not activity_queue.empty():
+            batch.append(activity_queue.get_nowait())
+
+        by_execution: dict[str, list[dict[str, Any]]] = {}
+        for execution_id, activity in batch:
+            by_execution.setdefault(execution_id, []).append(activity)
+        for execution_id, activities in by_execution.items():
+            await broadcast(execution_id, {"type": "file-activity-batch", "activities": activities})
@@ -0,0 +1,31 @@
+"""Tests for rewriting host MCP configs for use inside the agent container."""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+from backend.services.docker_runner import _rewrite_mcp_config
+from backend.services.orchestrator import _write_mcp_config
+
+
+def test_rewrite_mcp_config_points_at_container_paths():
+    host_path = _write_mcp_config("exec-1")
+    try:
+        with open(host_path) as f:
+            assert json.load(f)["mcpServers"]["orchestra"]["command"] == sys.executable
+
+        rewritten_path = _rewrite_mcp_config(host_path, "http://host.docker.internal:8000")
+        try:
+            with open(rewritten_path) as f:
+                server = json.load(f)["mcpServers"]["orchestra"]
+        finally:
+            os.unlink(rewritten_path)
+    finally:
+        os.unlink(host_path)
+
+    assert server["command"] == "python"
+    assert server["args"] == ["/app/backend/mcp_bridge.py"]
+    assert server["env"]["ORCHESTRA_API_URL"] == "http://host.docker.internal:8000"
+    assert server["env"]["ORCHESTRA_EXECUTION_ID"] == "exec-1"
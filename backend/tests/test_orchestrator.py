@@ -0,0 +1,153 @@
+"""Tests for the static pipeline orchestrator: tool-call output lines and dependsOn scheduling."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+from fastapi import HTTPException
+
+from backend.models import CreateExecutionRequest
+from backend.routes.executions import _build_pipeline
+from backend.services import orchestrator
+from backend.services.orchestrator import _format_tool_line
+
+
+def _legacy_tool_line(tool_name: str, tool_input: dict[str, Any]) -> str:
+    """The if/elif chain _TOOL_LINE_FORMATS replaced."""
+    tool_line = f"[{tool_name}]"
+    if tool_name == "Bash" and "command" in tool_input:
+        tool_line = f"$ {tool_input['command']}"
+    elif tool_name == "Read" and "file_path" in tool_input:
+        tool_line = f"[Read] {tool_input['file_path']}"
+    elif tool_name in ("Edit", "Write") and "file_path" in tool_input:
+        tool_line = f"[{tool_name}] {tool_input['file_path']}"
+    elif tool_name == "Grep" and "pattern" in tool_input:
+        tool_line = f"[Grep] {tool_input['pattern']}"
+    elif tool_name == "Glob" and "pattern" in tool_input:
+        tool_line = f"[Glob] {tool_input['pattern']}"
+    elif tool_name == "mcp__orchestra__ask_user":
+        q = tool_input.get("question", "")
+        tool_line = f"[Asking user] {q}"
+    return tool_line
+
+
+_TOOL_NAMES = [
+    "Bash", "Read", "Edit", "Write", "Grep", "Glob", "mcp__orchestra__ask_user",
+    "WebFetch", "unknown",
+]
+
+_TOOL_INPUTS = [
+    {},
+    {"command": "ls -la"},
+    {"file_path": "src/app.py"},
+    {"pattern": "TODO"},
+    {"question": "Which database?"},
+    {"question": ""},
+    {"command": "make", "file_path": "Makefile", "pattern": "*.py", "question": "Ok?"},
+]
+
+
+@pytest.mark.parametrize("tool_name", _TOOL_NAMES)
+@pytest.mark.parametrize("tool_input", _TOOL_INPUTS)
+def test_format_tool_line_matches_legacy_chain(tool_name, tool_input):
+    assert _format_tool_line(tool_name, tool_input) == _legacy_tool_line(tool_name, tool_input)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# dependsOn scheduling
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def _dag_pipeline(depends_on: dict[str, list[str]]) -> list[dict[str, Any]]:
+    return [
+        {"phase": phase, "group": 0, "status": "pending", "agentRole": "developer",
+         "dependsOn": deps, "output": []}
+        for phase, deps in depends_on.items()
+    ]
+
+
+def test_validate_dependencies_rejects_unknown_phases_and_cycles():
+    orchestrator.validate_dependencies({"plan": set(), "develop": {"plan"}})
+    with pytest.raises(ValueError, match="unknown"):
+        orchestrator.validate_dependencies({"develop": {"plan"}})
+    with pytest.raises(ValueError, match="cycle"):
+        orchestrator.validate_dependencies({"test": {"develop"}, "develop": {"test"}})
+
+
+def test_dag_runs_each_phase_after_its_dependencies(monkeypatch):
+    started: list[str] = []
+
+    async def fake_run_phase(execution_id, step, next_agents):
+        started.append(step["phase"])
+        await asyncio.sleep(0.01 if step["phase"] == "develop" else 0)
+        step["status"] = "completed"
+
+    monkeypatch.setattr(orchestrator, "_run_phase", fake_run_phase)
+    pipeline = _dag_pipeline({
+        "report": ["test", "security"],
+        "test": ["develop"],
+        "security": [],
+        "develop": [],
+    })
+    asyncio.run(orchestrator._run_pipeline_dag("exec-dag", pipeline))
+
+    assert started.index("test") > started.index("develop")
+    assert started[-1] == "report"
+    assert all(step["status"] == "completed" for step in pipeline)
+
+
+def test_dag_skips_dependents_of_a_failed_phase(monkeypatch):
+    started: list[str] = []
+
+    async def fake_run_phase(execution_id, step, next_agents):
+        started.append(step["phase"])
+        if step["phase"] == "develop":
+            raise RuntimeError("develop failed")
+        step["status"] = "completed"
+
+    monkeypatch.setattr(orchestrator, "_run_phase", fake_run_phase)
+    pipeline = _dag_pipeline({
+        "develop": [],
+        "test": ["develop"],
+        "report": ["test"],
+        "security": [],
+    })
+    with pytest.raises(RuntimeError, match="develop failed"):
+        asyncio.run(orchestrator._run_pipeline_dag("exec-dag", pipeline))
+
+    status = {step["phase"]: step["status"] for step in pipeline}
+    assert status == {"develop": "failed", "test": "skipped", "report": "skipped", "security": "completed"}
+    assert sorted(started) == ["develop", "security"]
+
+
+def test_build_pipeline_attaches_depends_on():
+    req = CreateExecutionRequest.model_validate({
+        "workflow": "quick-fix",
+        "task": "fix it",
+        "dependsOn": {"security": [], "report": ["test"]},
+    })
+    pipeline = _build_pipeline(req)
+    assert {step["phase"]: step["dependsOn"] for step in pipeline} == {
+        "develop": [], "test": [], "security": [], "report": ["test"],
+    }
+
+
+@pytest.mark.parametrize("depends_on", [
+    {"report": ["plan"]},
+    {"plan": []},
+    {"test": ["report"], "report": ["test"]},
+])
+def test_build_pipeline_rejects_invalid_depends_on(depends_on):
+    req = CreateExecutionRequest.model_validate({
+        "workflow": "quick-fix", "task": "fix it", "dependsOn": depends_on,
+    })
+    with pytest.raises(HTTPException) as exc_info:
+        _build_pipeline(req)
+    assert exc_info.value.status_code == 422
+
+
+def test_build_pipeline_without_depends_on_runs_by_group():
+    req = CreateExecutionRequest.model_validate({"workflow": "quick-fix", "task": "fix it"})
+    assert all("dependsOn" not in step for step in _build_pipeline(req))
@@ -0,0 +1,81 @@
+"""Tests for finding and file-activity detection in orchestrator output."""
+
+from __future__ import annotations
+
+import itertools
+import random
+
+from backend.services.parser import (
+    _FINDING_PATTERNS,
+    detect_agent_activity,
+    iter_findings,
+    parse_finding,
+)
+
+
+def _legacy_finding(line: str) -> tuple[str, str, str] | None:
+    """The per-pattern loop _FINDING_RE replaced: first pattern in list order wins."""
+    for pattern, severity, finding_type in _FINDING_PATTERNS:
+        match = pattern.search(line)
+        if match:
+            title = match.group(1) if match.lastindex else line.strip()
+            return severity, finding_type, title.strip()
+    return None
+
+
+def _summary(finding: dict | None) -> tuple[str, str, str] | None:
+    if finding is None:
+        return None
+    return finding["severity"], finding["type"], finding["title"]
+
+
+_FRAGMENTS = [
+    "CRITICAL:", "critical: ", "VULNERABILITY:", "Finding:", "SECRET FOUND:",
+    "secret   detected: ", "SECRET:", "CVE-2024-12345", "cve-99-1", "WARNING:",
+    "warning:   ", " token", " in app.py", "  ", "", "all good", ":", "\t",
+]
+
+_EDGE_CASES = [
+    "",
+    "plain output",
+    "CRITICAL:",
+    "CRITICAL:   ",
+    "WARNING: unused import; CRITICAL: hardcoded key",
+    "see CVE-2023-4863 then FINDING: weak hash",
+    "VULNERABILITY: sqli and CVE-2021-44228",
+    "Secret Detected:   AWS key  ",
+    "line with\nCRITICAL: across a newline",
+]
+
+
+def test_finding_regex_matches_legacy_per_pattern_loop():
+    rng = random.Random(1234)
+    generated = [
+        "".join(rng.choice(_FRAGMENTS) for _ in range(rng.randint(1, 5)))
+        for _ in range(2000)
+    ]
+    for line in itertools.chain(_EDGE_CASES, generated):
+        assert _summary(parse_finding(line, "exec-1")) == _legacy_finding(line), line
+
+
+def test_iter_findings_matches_parse_finding_per_line():
+    lines = ["build ok", "CRITICAL: exposed token", "", "warning: deprecated", "CVE-2024-1 noted"]
+    found = {index: _summary(finding) for index, finding in iter_findings(lines, "exec-1")}
+    expected = {
+        index: _summary(parse_finding(line, "exec-1"))
+        for index, line in enumerate(lines)
+        if parse_finding(line, "exec-1")
+    }
+    assert found == expected
+    assert list(found) == [1, 3, 4]
+
+
+def test_detect_agent_activity_keeps_every_file_hit():
+    activity = detect_agent_activity([
+        "Created file 'src/app.py'",
+        "nothing here",
+        "Edited src/app.py",
+        "wrote README.md",
+    ])
+    assert activity is not None
+    assert activity["filesModified"] == ["src/app.py", "src/app.py", "README.md"]
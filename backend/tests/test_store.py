@@ -0,0 +1,237 @@
+"""Tests for the store's bounded containers, eviction cleanup and WebSocket outboxes."""
+
+from __future__ import annotations
+
+import asyncio
+
+import orjson
+import pytest
+
+from backend import store
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# LRUDict
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def test_lru_dict_evicts_least_recently_used():
+    evicted = []
+    cache = store.LRUDict(2, on_evict=lambda k, v: evicted.append((k, v)))
+    cache["a"] = 1
+    cache["b"] = 2
+    cache["c"] = 3
+    assert list(cache) == ["b", "c"]
+    assert evicted == [("a", 1)]
+
+
+def test_lru_dict_get_and_getitem_refresh_but_peek_does_not():
+    cache = store.LRUDict(2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1
+    cache["c"] = 3
+    assert list(cache) == ["a", "c"]
+
+    assert cache["a"] == 1
+    cache["d"] = 4
+    assert list(cache) == ["a", "d"]
+
+    assert cache.peek("a") == 1
+    cache["e"] = 5
+    assert list(cache) == ["d", "e"]
+    assert cache.get("missing", "default") == "default"
+
+
+def test_lru_dict_never_evicts_kept_entries():
+    cache = store.LRUDict(2, keep=lambda value: value == "pinned")
+    cache["a"] = "pinned"
+    cache["b"] = "done"
+    cache["c"] = "done"
+    assert list(cache) == ["a", "c"]
+
+    # Only pinned entries are older than the newest one: grow past the cap
+    cache["c"] = "pinned"
+    cache["d"] = "done"
+    assert list(cache) == ["a", "c", "d"]
+
+    # Once unpinned, the extra entries are evicted on the next write
+    cache["a"] = "done"
+    cache["c"] = "done"
+    cache["e"] = "done"
+    assert list(cache) == ["c", "e"]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Execution eviction
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+@pytest.fixture
+def fresh_store(monkeypatch):
+    """Swap the store's containers for empty ones, with an execution cap of 2."""
+    monkeypatch.setattr(store, "executions", store.LRUDict(
+        2, on_evict=store._drop_execution_state, keep=store._execution_active,
+    ))
+    monkeypatch.setattr(store, "conversations", store.LRUDict(
+        10, on_evict=store._drop_conversation_state, keep=store._conversation_active,
+    ))
+    for name in (
+        "findings", "websocket_connections", "pending_questions",
+        "pending_questions_by_execution", "dynamic_agents", "file_activities",
+        "files_modified", "execution_to_conversations",
+    ):
+        monkeypatch.setattr(store, name, {})
+    monkeypatch.setattr(store, "execution_messages", store.LRUDict(10))
+    monkeypatch.setattr(store, "console_messages", store.LRUDict(10))
+    monkeypatch.setattr(store, "_replay_cache", store.LRUDict(10))
+    monkeypatch.setattr(store, "_execution_release_hooks", [])
+    return store
+
+
+def _execution(execution_id: str, status: str) -> dict:
+    return {"id": execution_id, "status": status, "findings": []}
+
+
+def test_drop_execution_state_releases_every_index(fresh_store):
+    released = []
+    store.on_execution_released(released.append)
+
+    execution = _execution("exec-1", "completed")
+    store.executions["exec-1"] = execution
+    store.findings["find-1"] = {"id": "find-1"}
+    execution["findings"].append("find-1")
+    question = store.PendingQuestion("q-1", "exec-1", "Proceed?", [])
+    store.pending_questions["q-1"] = question
+    store.pending_questions_by_execution["exec-1"] = {"q-1": question}
+    conversation = {"id": "conv-1", "activeExecutionId": None}
+    store.conversations["conv-1"] = conversation
+    store.set_active_execution(conversation, "exec-1")
+    store.websocket_connections["exec-1"] = set()
+    store.execution_messages["exec-1"] = store.MessageBuffer([{"type": "output"}])
+    store.replay_frame(store.execution_messages, "exec-1")
+    store.dynamic_agents["exec-1"] = {}
+    store.file_activities["exec-1"] = []
+    store.files_modified["exec-1"] = {}
+
+    store._drop_execution_state("exec-1", execution)
+
+    assert not store.findings
+    assert not store.pending_questions
+    assert not store.pending_questions_by_execution
+    assert not store.execution_to_conversations
+    assert conversation["activeExecutionId"] is None
+    assert "exec-1" not in store.websocket_connections
+    assert "exec-1" not in store.execution_messages
+    assert "exec-1" not in store._replay_cache
+    assert not store.dynamic_agents
+    assert not store.file_activities
+    assert not store.files_modified
+    assert released == ["exec-1"]
+
+
+def test_eviction_skips_queued_and_running_executions(fresh_store):
+    store.executions["exec-1"] = _execution("exec-1", "running")
+    store.executions["exec-2"] = _execution("exec-2", "completed")
+    store.findings["find-2"] = {"id": "find-2"}
+    store.executions["exec-2"]["findings"].append("find-2")
+    store.executions["exec-3"] = _execution("exec-3", "queued")
+
+    assert list(store.executions) == ["exec-1", "exec-3"]
+    assert "find-2" not in store.findings
+
+    store.executions["exec-4"] = _execution("exec-4", "queued")
+    assert list(store.executions) == ["exec-1", "exec-3", "exec-4"]
+
+
+def test_evicted_conversation_is_unlinked(fresh_store):
+    conversation = {"id": "conv-1", "activeExecutionId": None}
+    store.set_active_execution(conversation, "exec-1")
+    store.console_messages["conv-1"] = store.MessageBuffer([{"type": "console-text"}])
+
+    store._drop_conversation_state("conv-1", conversation)
+
+    assert not store.execution_to_conversations
+    assert "conv-1" not in store.console_messages
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Outboxes
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+class _BlockedSocket:
+    """WebSocket stand-in whose sends wait until released."""
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+        self.release = asyncio.Event()
+
+    async def send_text(self, payload: str) -> None:
+        await self.release.wait()
+        self.sent.append(payload)
+
+
+class _FailingSocket:
+    async def send_text(self, payload: str) -> None:
+        raise ValueError("not serializable")
+
+
+def test_outbox_overflow_drops_output_and_keeps_events(monkeypatch):
+    monkeypatch.setattr(store, "_OUTBOX_CAP", 3)
+    monkeypatch.setattr(store, "frames_dropped", 0)
+
+    async def scenario():
+        ws = _BlockedSocket()
+        outbox = store._Outbox(ws, {ws})
+        try:
+            outbox.put("out-1", True)
+            outbox.put("event-1", False)
+            outbox.put("out-2", True)
+            # Full with an output frame at the head: the head is dropped
+            outbox.put("event-2", False)
+            assert [p for p, _ in outbox.frames] == ["event-1", "out-2", "event-2"]
+            # Full with an event at the head: an incoming output frame is dropped
+            outbox.put("out-3", True)
+            assert [p for p, _ in outbox.frames] == ["event-1", "out-2", "event-2"]
+            # Events are never dropped
+            outbox.put("event-3", False)
+            assert [p for p, _ in outbox.frames] == ["event-1", "out-2", "event-2", "event-3"]
+        finally:
+            outbox.task.cancel()
+
+    asyncio.run(scenario())
+    assert store.frames_dropped == 2
+
+
+def test_outbox_coalesces_queued_frames_into_one_batch():
+    async def scenario():
+        ws = _BlockedSocket()
+        connections = {ws}
+        store._enqueue(connections, {"type": "output", "line": "a"}, None)
+        store._enqueue(connections, {"type": "output", "line": "b"}, None)
+        store._enqueue(connections, {"type": "complete"}, None)
+        ws.release.set()
+        await asyncio.sleep(0.01)
+        store.release_websocket(ws)
+        return ws.sent
+
+    sent = asyncio.run(scenario())
+    assert len(sent) == 1
+    frame = orjson.loads(sent[0])
+    assert frame["type"] == "batch"
+    assert [m["type"] for m in frame["messages"]] == ["output", "output", "complete"]
+
+
+def test_outbox_send_failure_unregisters_socket(caplog):
+    async def scenario():
+        ws = _FailingSocket()
+        connections = {ws}
+        store._enqueue(connections, {"type": "complete"}, None)
+        await asyncio.sleep(0.01)
+        return ws, connections
+
+    ws, connections = asyncio.run(scenario())
+    assert ws not in connections
+    assert ws not in store._outboxes
+    assert "WebSocket sender failed" in caplog.text
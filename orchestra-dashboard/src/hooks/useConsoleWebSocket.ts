@@ -4,6 +4,7 @@ import type {
   WsExecutionSnapshotMessage,
   Screenshot,
 } from '../lib/types.ts';
+import { parseWsFrame } from '../lib/wsFrames.ts';
 
 export type ExecutionWsStatus = 'running' | 'completed' | 'failed' | null;
 
@@ -61,6 +62,14 @@ export function useConsoleWebSocket(conversationId: string | null): UseConsoleWe
           messageId: `output-${Date.now()}-${Math.random()}`,
         }]);
         break;
+      case 'output-batch':
+        // Backend coalesces orchestrator output; expand into one console-text per line
+        setMessages(prev => [...prev, ...msg.lines.map((line, i) => ({
+          type: 'console-text' as const,
+          text: line,
+          messageId: `${msg.messageId}-${i}`,
+        }))]);
+        break;
       case 'complete':
         setExecutionStatus(msg.status === 'completed' ? 'completed' : 'failed');
         setMessages(prev => [...prev, msg]);
@@ -149,8 +158,9 @@ export function useConsoleWebSocket(conversationId: string | null): UseConsoleWe
 
       ws.onmessage = (event: MessageEvent) => {
         if (cleaned) return;
-        const msg = JSON.parse(event.data as string) as WsConsoleMessage;
-        handleMessage(msg);
+        for (const msg of parseWsFrame<WsConsoleMessage>(event.data as string)) {
+          handleMessage(msg);
+        }
       };
 
       ws.onclose = () => {
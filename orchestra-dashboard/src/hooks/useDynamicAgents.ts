@@ -1,5 +1,12 @@
 import { useState, useEffect, useRef } from 'react';
-import type { DynamicAgent, FileActivityEvent, FileTreeNode, WsConsoleMessage } from '../lib/types.ts';
+import type {
+  DynamicAgent,
+  FileActivityEvent,
+  FileTreeNode,
+  WsConsoleMessage,
+  WsFileActivityBatchMessage,
+  WsFileActivityMessage,
+} from '../lib/types.ts';
 
 interface UseDynamicAgentsReturn {
   agents: DynamicAgent[];
@@ -107,21 +114,29 @@ export function useDynamicAgents(wsMessages: WsConsoleMessage[]): UseDynamicAgen
               : a
           )
         );
-      } else if (msg.type === 'file-activity') {
-        const fileMsg = msg as unknown as { type: 'file-activity'; file: string; action: FileActivityEvent['action']; agentId: string; agentName: string };
+      } else if (msg.type === 'file-activity' || msg.type === 'file-activity-batch') {
+        // The backend coalesces bursts into file-activity-batch frames
+        const batch = msg.type === 'file-activity-batch'
+          ? (msg as WsFileActivityBatchMessage).activities
+          : [msg as WsFileActivityMessage];
         const timestamp = new Date().toISOString();
-        setFileActivities(prev => [...prev, {
+        setFileActivities(prev => [...prev, ...batch.map(fileMsg => ({
           file: fileMsg.file,
           action: fileMsg.action,
           agentId: fileMsg.agentId,
           agentName: fileMsg.agentName,
           timestamp,
-        }]);
+        }))]);
         // Update active files within the effect (safe to call Date.now here)
-        if (fileMsg.action !== 'read') {
-          setActiveFiles(prev =>
-            prev.includes(fileMsg.file) ? prev : [...prev, fileMsg.file],
-          );
+        const touched = batch.filter(fileMsg => fileMsg.action !== 'read').map(fileMsg => fileMsg.file);
+        if (touched.length > 0) {
+          setActiveFiles(prev => {
+            const next = [...prev];
+            for (const file of touched) {
+              if (!next.includes(file)) next.push(file);
+            }
+            return next.length === prev.length ? prev : next;
+          });
         }
       }
     }
@@ -9,6 +9,7 @@ import type {
 } from '../lib/types.ts';
 import { fetchExecution, fetchDynamicAgents, fetchAgents } from '../lib/api.ts';
 import { calculateAgentPositions } from '../lib/layoutEngine.ts';
+import { parseWsFrame } from '../lib/wsFrames.ts';
 
 /** Maps backend pipeline phase names to agent roles for office visualization. */
 const PHASE_AGENTS: Record<string, string> = {
@@ -323,8 +324,9 @@ export function useOfficeState(executionId: string | null): OfficeState {
 
       ws.onmessage = (event: MessageEvent) => {
         if (cancelled) return;
-        const msg = JSON.parse(event.data as string) as WsConsoleMessage;
-        handleMessage(msg);
+        for (const msg of parseWsFrame<WsConsoleMessage>(event.data as string)) {
+          handleMessage(msg);
+        }
       };
 
       ws.onclose = () => {
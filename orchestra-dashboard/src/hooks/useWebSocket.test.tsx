@@ -111,6 +111,49 @@ describe('useWebSocket', () => {
     expect(result.current.lines).toEqual(['Line 1', 'Line 2']);
   });
 
+  it('expands output-batch messages into lines', () => {
+    const { result } = renderHook(() => useWebSocket('exec-001'));
+    const ws = MockWebSocket.instances[0];
+
+    act(() => {
+      ws.onopen?.();
+    });
+
+    act(() => {
+      ws.onmessage?.({
+        data: JSON.stringify({ type: 'output-batch', lines: ['Line 1', 'Line 2'], phase: 'orchestrator' }),
+      });
+    });
+
+    expect(result.current.lines).toEqual(['Line 1', 'Line 2']);
+    expect(result.current.currentPhase).toBe('orchestrator');
+  });
+
+  it('unpacks batch frames into their messages', () => {
+    const { result } = renderHook(() => useWebSocket('exec-001'));
+    const ws = MockWebSocket.instances[0];
+
+    act(() => {
+      ws.onopen?.();
+    });
+
+    act(() => {
+      ws.onmessage?.({
+        data: JSON.stringify({
+          type: 'batch',
+          messages: [
+            { type: 'output', line: 'Line 1', phase: 'develop' },
+            { type: 'phase', phase: 'test', status: 'running' },
+          ],
+        }),
+      });
+    });
+
+    expect(result.current.lines).toEqual(['Line 1']);
+    expect(result.current.currentPhase).toBe('test');
+    expect(result.current.status).toBe('running');
+  });
+
   it('handles phase messages', () => {
     const { result } = renderHook(() => useWebSocket('exec-001'));
     const ws = MockWebSocket.instances[0];
@@ -1,5 +1,6 @@
 import { useState, useEffect, useRef, useCallback } from 'react';
 import type { WsConsoleMessage } from '../lib/types.ts';
+import { parseWsFrame } from '../lib/wsFrames.ts';
 
 export interface WsOutputMessage {
   type: 'output';
@@ -7,6 +8,12 @@ export interface WsOutputMessage {
   phase: string;
 }
 
+export interface WsOutputBatchMessage {
+  type: 'output-batch';
+  lines: string[];
+  phase: string;
+}
+
 export interface WsPhaseMessage {
   type: 'phase';
   phase: string;
@@ -66,7 +73,7 @@ export interface WsAgentCompleteMessage {
   status?: string;
 }
 
-export type WsMessage = WsOutputMessage | WsPhaseMessage | WsFindingMessage | WsCompleteMessage | WsClarificationMessage | WsClarificationDismissedMessage | WsExecutionSnapshotMessage | WsAgentSpawnMessage | WsAgentOutputMessage | WsAgentCompleteMessage;
+export type WsMessage = WsOutputMessage | WsOutputBatchMessage | WsPhaseMessage | WsFindingMessage | WsCompleteMessage | WsClarificationMessage | WsClarificationDismissedMessage | WsExecutionSnapshotMessage | WsAgentSpawnMessage | WsAgentOutputMessage | WsAgentCompleteMessage;
 
 interface UseWebSocketResult {
   lines: string[];
@@ -129,63 +136,68 @@ export function useWebSocket(executionId: string | null): UseWebSocketResult {
 
       ws.onmessage = (event: MessageEvent) => {
         if (cleaned) return;
-        const msg = JSON.parse(event.data as string) as WsMessage;
-        setMessages(prev => [...prev, msg as unknown as WsConsoleMessage]);
-        switch (msg.type) {
-          case 'output':
-            setLines(prev => [...prev, msg.line]);
-            setCurrentPhase(msg.phase);
-            break;
-          case 'phase':
-            setCurrentPhase(msg.phase);
-            setStatus(msg.status);
-            break;
-          case 'complete':
-            setStatus(msg.status);
-            break;
-          case 'clarification':
-            setPendingQuestion(msg as WsClarificationMessage);
-            break;
-          case 'clarification-dismissed':
-            setPendingQuestion(null);
-            break;
-          case 'agent-spawn': {
-            const spawn = msg as WsAgentSpawnMessage;
-            const label = spawn.agent?.name ?? spawn.name ?? spawn.agent?.id ?? spawn.agentId ?? 'agent';
-            const task = spawn.agent?.task ?? spawn.task ?? '';
-            const spawnText = task ? `[Agent: ${label}] Starting: ${task}` : `[Agent: ${label}] Starting...`;
-            setLines(prev => [...prev, spawnText]);
-            break;
-          }
-          case 'agent-output': {
-            const ao = msg as WsAgentOutputMessage;
-            if (ao.line) {
-              setLines(prev => [...prev, ao.line]);
+        for (const msg of parseWsFrame<WsMessage>(event.data as string)) {
+          setMessages(prev => [...prev, msg as unknown as WsConsoleMessage]);
+          switch (msg.type) {
+            case 'output':
+              setLines(prev => [...prev, msg.line]);
+              setCurrentPhase(msg.phase);
+              break;
+            case 'output-batch':
+              setLines(prev => [...prev, ...msg.lines]);
+              setCurrentPhase(msg.phase);
+              break;
+            case 'phase':
+              setCurrentPhase(msg.phase);
+              setStatus(msg.status);
+              break;
+            case 'complete':
+              setStatus(msg.status);
+              break;
+            case 'clarification':
+              setPendingQuestion(msg as WsClarificationMessage);
+              break;
+            case 'clarification-dismissed':
+              setPendingQuestion(null);
+              break;
+            case 'agent-spawn': {
+              const spawn = msg as WsAgentSpawnMessage;
+              const label = spawn.agent?.name ?? spawn.name ?? spawn.agent?.id ?? spawn.agentId ?? 'agent';
+              const task = spawn.agent?.task ?? spawn.task ?? '';
+              const spawnText = task ? `[Agent: ${label}] Starting: ${task}` : `[Agent: ${label}] Starting...`;
+              setLines(prev => [...prev, spawnText]);
+              break;
             }
-            break;
-          }
-          case 'agent-complete': {
-            const ac = msg as WsAgentCompleteMessage;
-            const name = ac.name ?? ac.agentId ?? 'agent';
-            setLines(prev => [...prev, `[Agent: ${name}] Completed`]);
-            break;
-          }
-          case 'execution-snapshot': {
-            const snap = (msg as WsExecutionSnapshotMessage).execution;
-            if (snap) {
-              if (snap.status === 'completed') {
-                setStatus('completed');
-              } else if (snap.status === 'failed') {
-                setStatus('failed');
-              } else {
-                setStatus(snap.status);
+            case 'agent-output': {
+              const ao = msg as WsAgentOutputMessage;
+              if (ao.line) {
+                setLines(prev => [...prev, ao.line]);
               }
-              const runningStep = snap.pipeline?.find((s) => s.status === 'running');
-              if (runningStep) {
-                setCurrentPhase(runningStep.phase);
+              break;
+            }
+            case 'agent-complete': {
+              const ac = msg as WsAgentCompleteMessage;
+              const name = ac.name ?? ac.agentId ?? 'agent';
+              setLines(prev => [...prev, `[Agent: ${name}] Completed`]);
+              break;
+            }
+            case 'execution-snapshot': {
+              const snap = (msg as WsExecutionSnapshotMessage).execution;
+              if (snap) {
+                if (snap.status === 'completed') {
+                  setStatus('completed');
+                } else if (snap.status === 'failed') {
+                  setStatus('failed');
+                } else {
+                  setStatus(snap.status);
+                }
+                const runningStep = snap.pipeline?.find((s) => s.status === 'running');
+                if (runningStep) {
+                  setCurrentPhase(runningStep.phase);
+                }
               }
+              break;
             }
-            break;
           }
         }
       };
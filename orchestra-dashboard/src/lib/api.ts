@@ -1,4 +1,4 @@
-import type { Execution, AgentInfo, Finding, WorkflowType, ProjectSource, AuthStatus, GitHubLoginResponse, GitHubLoginStatus, ClaudeLoginResponse, ClaudeLoginStatus, BrowseResponse, Conversation, Screenshot, Codebase, DynamicAgent, FileActivityEvent } from './types.ts';
+import type { Execution, AgentInfo, Finding, WorkflowType, PipelinePhase, ProjectSource, AuthStatus, GitHubLoginResponse, GitHubLoginStatus, ClaudeLoginResponse, ClaudeLoginStatus, BrowseResponse, Conversation, Screenshot, Codebase, DynamicAgent, FileActivityEvent } from './types.ts';
 export type { AgentInfo };
 
 const API_BASE = import.meta.env.VITE_API_URL || '';
@@ -28,6 +28,7 @@ export function createExecution(params: {
   model: string;
   target: string;
   projectSource: ProjectSource;
+  dependsOn?: Partial<Record<PipelinePhase, PipelinePhase[]>>;
 }): Promise<Execution> {
   return apiFetch<Execution>('/api/executions/', {
     method: 'POST',
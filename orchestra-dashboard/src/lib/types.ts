@@ -20,6 +20,7 @@ export interface PipelineStep {
   group: number;
   status: PhaseStatus;
   agentRole: AgentRole | null;
+  dependsOn?: PipelinePhase[];
   startedAt: string | null;
   completedAt: string | null;
   output: string[];
@@ -361,6 +362,13 @@ export interface WsOutputMessage {
   phase: string;
 }
 
+export interface WsOutputBatchMessage {
+  type: 'output-batch';
+  lines: string[];
+  phase: string;
+  messageId: string;
+}
+
 export interface WsCompleteMessage {
   type: 'complete';
   status: string;
@@ -444,6 +452,11 @@ export interface WsFileActivityMessage {
   agentName: string;
 }
 
+export interface WsFileActivityBatchMessage {
+  type: 'file-activity-batch';
+  activities: Omit<WsFileActivityMessage, 'type'>[];
+}
+
 export interface WsExecutionSnapshotMessage {
   type: 'execution-snapshot';
   execution: {
@@ -463,9 +476,11 @@ export type WsConsoleMessage =
   | WsBusinessEvalMessage
   | WsExecutionStartMessage
   | WsOutputMessage
+  | WsOutputBatchMessage
   | WsCompleteMessage
   | WsAgentSpawnMessage
   | WsAgentOutputMessage
   | WsAgentCompleteMessage
   | WsFileActivityMessage
+  | WsFileActivityBatchMessage
   | WsExecutionSnapshotMessage;
@@ -0,0 +1,16 @@
+import { describe, it, expect } from 'vitest';
+import { parseWsFrame } from './wsFrames';
+
+describe('parseWsFrame', () => {
+  it('wraps a single message in an array', () => {
+    const msg = { type: 'phase', phase: 'develop', status: 'running' };
+    expect(parseWsFrame(JSON.stringify(msg))).toEqual([msg]);
+  });
+
+  it('unwraps the messages of a batch frame in order', () => {
+    const first = { type: 'output', line: 'Line 1', phase: 'develop' };
+    const second = { type: 'complete', status: 'completed' };
+    const frame = JSON.stringify({ type: 'batch', messages: [first, second] });
+    expect(parseWsFrame(frame)).toEqual([first, second]);
+  });
+});
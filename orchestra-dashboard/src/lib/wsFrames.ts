@@ -0,0 +1,11 @@
+interface WsBatchFrame<T> {
+  type: 'batch';
+  messages: T[];
+}
+
+// The backend coalesces messages queued for a slow socket into one batch frame
+export function parseWsFrame<T>(data: string): T[] {
+  const frame = JSON.parse(data) as T | WsBatchFrame<T>;
+  const batch = frame as WsBatchFrame<T>;
+  return batch.type === 'batch' ? batch.messages : [frame as T];
+}
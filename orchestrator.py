@@ -20,6 +20,7 @@ Usage:
 
 import asyncio
 import argparse
+import functools
 import os
 import sys
 import json
@@ -28,21 +29,17 @@ from pathlib import Path
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Agent SDK import — install with: pip install claude-agent-sdk
+# Deferred until an orchestration runs, so --help and argument errors stay fast
 # ──────────────────────────────────────────────────────────────────────────────
-try:
-    from claude_agent_sdk import query, ClaudeAgentOptions, AgentDefinition
-except ImportError:
-    print("Error: claude-agent-sdk not installed.")
-    print("Install with: pip install claude-agent-sdk")
-    sys.exit(1)
-
-# ──────────────────────────────────────────────────────────────────────────────
-# Import agent definitions
-# ──────────────────────────────────────────────────────────────────────────────
-from agents.developer import DEVELOPER_PRIMARY, DEVELOPER_SECONDARY
-from agents.tester import TESTER
-from agents.devsecops import DEVSECOPS
-from agents.business_dev import BUSINESS_DEV
+def _load_sdk():
+    """Import the Agent SDK, exiting with install instructions if it is missing."""
+    try:
+        import claude_agent_sdk
+    except ImportError:
+        print("Error: claude-agent-sdk not installed.")
+        print("Install with: pip install claude-agent-sdk")
+        sys.exit(1)
+    return claude_agent_sdk
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -172,6 +169,11 @@ def build_agent_definitions(agents_to_include: list[str] | None = None) -> dict:
     Build the agents dict for the Agent SDK.
     Optionally filter to only include specific agents.
     """
+    from agents.developer import DEVELOPER_PRIMARY, DEVELOPER_SECONDARY
+    from agents.tester import TESTER
+    from agents.devsecops import DEVSECOPS
+    from agents.business_dev import BUSINESS_DEV
+
     all_agents = {
         "developer": DEVELOPER_PRIMARY,
         "developer-2": DEVELOPER_SECONDARY,
@@ -195,6 +197,28 @@ WORKFLOW_AGENTS = {
 }
 
 
+@functools.lru_cache(maxsize=None)
+def workflow_agent_definitions(workflow: str) -> dict:
+    """
+    Return the AgentDefinition objects for a workflow's agents.
+    Built once per workflow; callers must not mutate the result.
+    """
+    AgentDefinition = _load_sdk().AgentDefinition
+    agents = build_agent_definitions(WORKFLOW_AGENTS.get(workflow))
+
+    # Convert our agent dicts to AgentDefinition objects
+    return {
+        key: AgentDefinition(
+            name=agent_config["name"],
+            description=agent_config["description"],
+            prompt=agent_config["prompt"],
+            tools=agent_config["tools"],
+            model=agent_config.get("model", "sonnet"),
+        )
+        for key, agent_config in agents.items()
+    }
+
+
 async def run_orchestrator(
     task: str,
     workflow: str = "full-pipeline",
@@ -224,19 +248,7 @@ async def run_orchestrator(
     task_prompt += f"\n\nRepository path: {os.path.abspath(repo_path)}"
 
     # Select agents for this workflow
-    agent_names = WORKFLOW_AGENTS.get(workflow)
-    agents = build_agent_definitions(agent_names)
-
-    # Convert our agent dicts to AgentDefinition objects
-    agent_definitions = {}
-    for key, agent_config in agents.items():
-        agent_definitions[key] = AgentDefinition(
-            name=agent_config["name"],
-            description=agent_config["description"],
-            prompt=agent_config["prompt"],
-            tools=agent_config["tools"],
-            model=agent_config.get("model", "sonnet"),
-        )
+    agent_definitions = workflow_agent_definitions(workflow)
 
     print(f"{'─' * 60}")
     print(f"  Agent Orchestra — {workflow}")
@@ -248,10 +260,12 @@ async def run_orchestrator(
     print(f"{'─' * 60}\n")
 
     # Run the orchestrator
+    sdk = _load_sdk()
     result_text = ""
-    async for message in query(
+    write = sys.stdout.write
+    async for message in sdk.query(
         prompt=f"{system_prompt}\n\n## Task\n{task_prompt}",
-        options=ClaudeAgentOptions(
+        options=sdk.ClaudeAgentOptions(
             allowed_tools=["Read", "Edit", "Write", "Bash", "Glob", "Grep", "Task"],
             agents=agent_definitions,
             model=model,
@@ -260,14 +274,19 @@ async def run_orchestrator(
         ),
     ):
         # Stream output
-        if hasattr(message, "content"):
-            for block in message.content:
-                if hasattr(block, "text"):
-                    if verbose:
-                        print(block.text)
-
-        if hasattr(message, "result"):
-            result_text = message.result
+        content = getattr(message, "content", None)
+        if verbose and content:
+            # Buffered writes, flushed once per message rather than per block
+            for block in content:
+                text = getattr(block, "text", None)
+                if text is not None:
+                    write(text)
+                    write("\n")
+            sys.stdout.flush()
+
+        result = getattr(message, "result", None)
+        if result is not None:
+            result_text = result
 
     print(f"\n{'═' * 60}")
     print("  ORCHESTRATOR REPORT")